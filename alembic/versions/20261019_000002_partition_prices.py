@@ -0,0 +1,89 @@
+from alembic import op
+
+
+revision = "20261019_000002_partition_prices"
+down_revision = "20240914_000001_init_schema"
+branch_labels = None
+depends_on = None
+
+
+# Hash partitions on drg_code; every provider query filters on a single DRG, so it touches one partition
+PRICE_PARTITIONS = 16
+
+PRICE_COLUMNS = (
+    "id, provider_id, drg_code, total_discharges, "
+    "average_covered_charges, average_total_payments, average_medicare_payments"
+)
+
+
+def _create_price_indexes() -> None:
+    # Created on the parent, so Postgres builds a matching local index on every partition
+    op.create_index("ix_prices_provider", "prices", ["provider_id"])
+    op.create_index("ix_prices_drg", "prices", ["drg_code"])
+    op.create_index("ix_prices_drg_cost", "prices", ["drg_code", "average_covered_charges"])
+
+
+def _rename_old_table(suffix: str) -> None:
+    op.execute(f"ALTER TABLE prices RENAME TO prices_{suffix}")
+    op.execute(f"ALTER TABLE prices_{suffix} RENAME CONSTRAINT prices_pkey TO prices_{suffix}_pkey")
+    for name in ("ix_prices_provider", "ix_prices_drg", "ix_prices_drg_cost"):
+        op.execute(f"ALTER INDEX {name} RENAME TO {name.replace('prices', f'prices_{suffix}', 1)}")
+
+
+def upgrade() -> None:
+    _rename_old_table("unpartitioned")
+
+    # The partition key must be part of the primary key; id keeps using the existing sequence
+    op.execute(
+        """
+        CREATE TABLE prices (
+            id integer NOT NULL DEFAULT nextval('prices_id_seq'),
+            provider_id integer NOT NULL REFERENCES providers(id),
+            drg_code integer NOT NULL REFERENCES drgs(code),
+            total_discharges integer,
+            average_covered_charges numeric(12, 2),
+            average_total_payments numeric(12, 2),
+            average_medicare_payments numeric(12, 2),
+            CONSTRAINT prices_pkey PRIMARY KEY (id, drg_code)
+        ) PARTITION BY HASH (drg_code)
+        """
+    )
+    for i in range(PRICE_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE prices_p{i:02d} PARTITION OF prices "
+            f"FOR VALUES WITH (MODULUS {PRICE_PARTITIONS}, REMAINDER {i})"
+        )
+
+    op.execute(f"INSERT INTO prices ({PRICE_COLUMNS}) SELECT {PRICE_COLUMNS} FROM prices_unpartitioned")
+    _create_price_indexes()
+
+    # Move sequence ownership before dropping the old table, otherwise the sequence goes with it
+    op.execute("ALTER SEQUENCE prices_id_seq OWNED BY prices.id")
+    op.execute("DROP TABLE prices_unpartitioned")
+    op.execute("ANALYZE prices")
+
+
+def downgrade() -> None:
+    _rename_old_table("partitioned")
+
+    op.execute(
+        """
+        CREATE TABLE prices (
+            id integer NOT NULL DEFAULT nextval('prices_id_seq'),
+            provider_id integer NOT NULL REFERENCES providers(id),
+            drg_code integer NOT NULL REFERENCES drgs(code),
+            total_discharges integer,
+            average_covered_charges numeric(12, 2),
+            average_total_payments numeric(12, 2),
+            average_medicare_payments numeric(12, 2),
+            CONSTRAINT prices_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(f"INSERT INTO prices ({PRICE_COLUMNS}) SELECT {PRICE_COLUMNS} FROM prices_partitioned")
+    _create_price_indexes()
+
+    op.execute("ALTER SEQUENCE prices_id_seq OWNED BY prices.id")
+    # Dropping the partitioned parent drops all of its partitions
+    op.execute("DROP TABLE prices_partitioned")
+    op.execute("ANALYZE prices")
@@ -0,0 +1,61 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_000003_price_years"
+down_revision = "20261019_000002_partition_prices"
+branch_labels = None
+depends_on = None
+
+
+# Rows loaded before prices carried a year are assigned to this CMS data year
+BACKFILL_YEAR = 2022
+
+
+def upgrade() -> None:
+    op.add_column("prices", sa.Column("year", sa.SmallInteger(), nullable=True))
+    op.add_column("prices", sa.Column("source_file", sa.String(length=255), nullable=True))
+    op.execute(f"UPDATE prices SET year = {BACKFILL_YEAR} WHERE year IS NULL")
+    op.alter_column("prices", "year", nullable=False)
+
+    # Re-running the old ETL appended duplicate rows; keep the newest before enforcing uniqueness
+    op.execute(
+        """
+        DELETE FROM prices pr
+        USING prices newer
+        WHERE newer.provider_id = pr.provider_id
+          AND newer.drg_code = pr.drg_code
+          AND newer.year = pr.year
+          AND newer.id > pr.id
+        """
+    )
+    op.create_unique_constraint("uq_prices_provider_drg_year", "prices", ["provider_id", "drg_code", "year"])
+
+    # Serves "latest year for DRG" (backward scan on (drg_code, year)) and the cost-ordered
+    # provider search for one DRG/year as an index-only scan; supersedes ix_prices_drg_cost
+    op.create_index(
+        "ix_prices_drg_year_cost",
+        "prices",
+        ["drg_code", "year", "average_covered_charges"],
+        postgresql_include=["provider_id", "average_total_payments", "average_medicare_payments", "total_discharges"],
+    )
+    op.drop_index("ix_prices_drg_cost", table_name="prices")
+    op.execute("ANALYZE prices")
+
+
+def downgrade() -> None:
+    op.create_index("ix_prices_drg_cost", "prices", ["drg_code", "average_covered_charges"])
+    op.drop_index("ix_prices_drg_year_cost", table_name="prices")
+    op.drop_constraint("uq_prices_provider_drg_year", "prices", type_="unique")
+    # Without a year dimension only one row per provider/DRG is meaningful; keep the latest year
+    op.execute(
+        """
+        DELETE FROM prices pr
+        USING prices newer
+        WHERE newer.provider_id = pr.provider_id
+          AND newer.drg_code = pr.drg_code
+          AND (newer.year, newer.id) > (pr.year, pr.id)
+        """
+    )
+    op.drop_column("prices", "source_file")
+    op.drop_column("prices", "year")
@@ -0,0 +1,56 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_000004_drg_price_stats"
+down_revision = "20261019_000003_price_years"
+branch_labels = None
+depends_on = None
+
+
+# US Census Bureau regions
+CENSUS_REGIONS = {
+    "Northeast": ["CT", "ME", "MA", "NH", "RI", "VT", "NJ", "NY", "PA"],
+    "Midwest": ["IL", "IN", "MI", "OH", "WI", "IA", "KS", "MN", "MO", "NE", "ND", "SD"],
+    "South": ["DE", "DC", "FL", "GA", "MD", "NC", "SC", "VA", "WV", "AL", "KY", "MS", "TN", "AR", "LA", "OK", "TX"],
+    "West": ["AZ", "CO", "ID", "MT", "NV", "NM", "UT", "WY", "AK", "CA", "HI", "OR", "WA"],
+}
+
+STAT_COLUMNS = ["min", "p10", "median", "p90", "mean"]
+
+
+def upgrade() -> None:
+    state_regions = op.create_table(
+        "state_regions",
+        sa.Column("state", sa.String(length=2), primary_key=True),
+        sa.Column("region", sa.String(length=16), nullable=False),
+    )
+    op.bulk_insert(
+        state_regions,
+        [{"state": state, "region": region} for region, states in CENSUS_REGIONS.items() for state in states],
+    )
+
+    # One row per DRG/year and scope (national, region, state); rebuilt by the ETL only for
+    # the DRGs/years it loads, so reads never aggregate over prices
+    op.create_table(
+        "drg_price_stats",
+        sa.Column("drg_code", sa.Integer(), sa.ForeignKey("drgs.code"), nullable=False),
+        sa.Column("year", sa.SmallInteger(), nullable=False),
+        sa.Column("scope", sa.String(length=8), nullable=False),
+        sa.Column("scope_value", sa.String(length=16), nullable=False),
+        sa.Column("provider_count", sa.Integer(), nullable=False),
+        *[sa.Column(f"covered_charges_{name}", sa.Numeric(12, 2)) for name in STAT_COLUMNS],
+        *[sa.Column(f"total_payments_{name}", sa.Numeric(12, 2)) for name in STAT_COLUMNS],
+        sa.Column("refreshed_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.PrimaryKeyConstraint("drg_code", "year", "scope", "scope_value"),
+        sa.CheckConstraint("scope IN ('national', 'region', 'state')", name="ck_drg_price_stats_scope"),
+    )
+
+    # National percentile of each price's covered charges within its DRG/year, set by the ETL
+    op.add_column("prices", sa.Column("charges_percentile", sa.Numeric(5, 2)))
+
+
+def downgrade() -> None:
+    op.drop_column("prices", "charges_percentile")
+    op.drop_table("drg_price_stats")
+    op.drop_table("state_regions")
@@ -0,0 +1,26 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261019_000005_provider_profiles"
+down_revision = "20261019_000004_drg_price_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Denormalized read model for GET /providers/{provider_id}: one JSONB document per provider
+    # (location, rating, latest-year price of every DRG billed), rebuilt by the ETL for the
+    # providers it loads, so a profile is a single primary-key lookup
+    op.create_table(
+        "provider_profiles",
+        sa.Column("provider_id", sa.String(length=16), sa.ForeignKey("providers.provider_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("profile", postgresql.JSONB(), nullable=False),
+        sa.Column("drg_count", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("provider_profiles")
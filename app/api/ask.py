@@ -1,20 +1,27 @@
-from typing import List
+from typing import Optional
 
 import sqlalchemy as sa
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db_session
+from app.db.session import get_read_db_session
 from app.schemas.ask import AskRequest, AskResult
-from app.schemas.providers import ProviderResult
 from app.services.nlp import parse_question
+from app.services.search import (
+    MAX_COMPARE_DRGS,
+    collapsed_drg_terms,
+    compare_providers,
+    find_zip_centroid,
+    resolve_drg_terms,
+    search_providers,
+)
 
 
 router = APIRouter(prefix="/ask", tags=["ask"])
 
 
 @router.post("", response_model=AskResult)
-async def ask(req: AskRequest, session: AsyncSession = Depends(get_db_session)) -> AskResult:
+async def ask(req: AskRequest, session: AsyncSession = Depends(get_read_db_session)) -> AskResult:
     parsed = await parse_question(req.question)
     intent = parsed.get("intent", "info")
 
@@ -35,18 +42,21 @@ async def ask(req: AskRequest, session: AsyncSession = Depends(get_db_session))
     radius_km = float(parsed.get("radius_km", 40.0))
     limit = int(parsed.get("limit", 5))
     sort = parsed.get("sort", "cost")
+    year = int(parsed["year"]) if parsed.get("year") else None
 
     if not zipc:
         return AskResult(answer="Please provide a ZIP code.", intent=intent, results=[], limit=limit, sort=sort)
 
     # Find ZIP centroid
-    zip_row = (
-        await session.execute(sa.text("SELECT latitude, longitude FROM zip_codes WHERE zip = :zip"), {"zip": zipc})
-    ).first()
+    zip_row = await find_zip_centroid(session, zipc)
     if not zip_row:
         return AskResult(answer="ZIP not found.", intent=intent, results=[], limit=limit, sort=sort)
     lat0, lon0 = zip_row
 
+    drg_terms = [str(t) for t in (parsed.get("drg_terms") or []) if str(t).strip()]
+    if intent == "compare" or len(drg_terms) > 1:
+        return await _ask_compare(session, drg_terms, zipc, lat0, lon0, radius_km, limit, sort, year)
+
     if drg_code is None and drg_text:
         drg_row = (
             await session.execute(
@@ -59,80 +69,16 @@ async def ask(req: AskRequest, session: AsyncSession = Depends(get_db_session))
     if drg_code is None:
         return AskResult(answer="Please specify a DRG code or description.", intent=intent, results=[], limit=limit, sort=sort)
 
-    order_sql = "pr.average_covered_charges ASC"
-    if sort == "rating":
-        order_sql = "avg_rating DESC NULLS LAST, pr.average_covered_charges ASC"
-
-    query = sa.text(
-        f"""
-        WITH origin AS (
-            SELECT CAST(:lat0 AS numeric) AS lat0, CAST(:lon0 AS numeric) AS lon0
-        )
-        SELECT 
-            p.provider_id,
-            p.provider_name,
-            p.provider_city,
-            p.provider_state,
-            p.provider_zip_code,
-            d.code AS drg_code,
-            d.description AS drg_description,
-            pr.average_covered_charges,
-            pr.average_total_payments,
-            pr.average_medicare_payments,
-            AVG(sr.rating) AS avg_rating,
-            2 * 6371 * asin(
-                sqrt(
-                    power(sin(radians((p.latitude - o.lat0)) / 2), 2) +
-                    cos(radians(o.lat0)) * cos(radians(p.latitude)) *
-                    power(sin(radians((p.longitude - o.lon0)) / 2), 2)
-                )
-            ) AS distance_km
-        FROM providers p
-        JOIN prices pr ON pr.provider_id = p.id
-        JOIN drgs d ON d.code = pr.drg_code
-        JOIN origin o ON TRUE
-        LEFT JOIN star_ratings sr ON sr.provider_id = p.id
-        WHERE p.latitude IS NOT NULL AND p.longitude IS NOT NULL
-          AND d.code = :drg_code
-        GROUP BY p.provider_id, p.provider_name, p.provider_city, p.provider_state, p.provider_zip_code,
-                 d.code, d.description, pr.average_covered_charges, pr.average_total_payments, pr.average_medicare_payments,
-                 o.lat0, o.lon0, p.latitude, p.longitude
-        HAVING 2 * 6371 * asin(
-                sqrt(
-                    power(sin(radians((p.latitude - o.lat0)) / 2), 2) +
-                    cos(radians(o.lat0)) * cos(radians(p.latitude)) *
-                    power(sin(radians((p.longitude - o.lon0)) / 2), 2)
-                )
-            ) <= :radius_km
-        ORDER BY {order_sql}
-        LIMIT :limit
-        """
+    results = await search_providers(
+        session,
+        lat0=lat0,
+        lon0=lon0,
+        drg_codes=[drg_code],
+        radius_km=radius_km,
+        limit=limit,
+        sort=sort,
+        year=year,
     )
-    rows = (
-        await session.execute(
-            query,
-            {"lat0": lat0, "lon0": lon0, "radius_km": radius_km, "limit": limit, "drg_code": drg_code},
-        )
-    ).fetchall()
-
-    results: list[ProviderResult] = []
-    for r in rows:
-        results.append(
-            ProviderResult(
-                provider_id=r.provider_id,
-                provider_name=r.provider_name,
-                provider_city=r.provider_city,
-                provider_state=r.provider_state,
-                provider_zip_code=r.provider_zip_code,
-                distance_km=float(r.distance_km),
-                drg_code=int(r.drg_code),
-                drg_description=r.drg_description,
-                average_covered_charges=float(r.average_covered_charges) if r.average_covered_charges is not None else None,
-                average_total_payments=float(r.average_total_payments) if r.average_total_payments is not None else None,
-                average_medicare_payments=float(r.average_medicare_payments) if r.average_medicare_payments is not None else None,
-                avg_rating=float(r.avg_rating) if r.avg_rating is not None else None,
-            )
-        )
 
     if intent == "cheapest":
         intent_text = f"Cheapest providers for DRG {drg_code} near {zipc}"
@@ -170,9 +116,70 @@ async def ask(req: AskRequest, session: AsyncSession = Depends(get_db_session))
         drg_code=drg_code,
         zip=zipc,
         radius_km=radius_km,
+        year=year,
         limit=limit,
         sort=sort,
         results=results,
     )
 
 
+async def _ask_compare(
+    session: AsyncSession,
+    drg_terms: list[str],
+    zipc: str,
+    lat0,
+    lon0,
+    radius_km: float,
+    limit: int,
+    sort: str,
+    year: Optional[int],
+) -> AskResult:
+    intent = "compare"
+    if len(drg_terms) < 2:
+        return AskResult(answer="Please name at least two procedures or DRG codes to compare.", intent=intent, results=[], limit=limit, sort=sort)
+
+    resolved = await resolve_drg_terms(session, drg_terms[:MAX_COMPARE_DRGS])
+    missing = [drg_terms[i] for i, ref in enumerate(resolved) if ref is None]
+    if missing:
+        return AskResult(answer=f"Could not find a DRG matching: {', '.join(missing)}.", intent=intent, results=[], limit=limit, sort=sort)
+    collapsed = collapsed_drg_terms(drg_terms[:MAX_COMPARE_DRGS], resolved)
+    if collapsed:
+        return AskResult(answer=collapsed, intent=intent, results=[], limit=limit, sort=sort)
+
+    comparisons = await compare_providers(
+        session,
+        lat0=lat0,
+        lon0=lon0,
+        drgs=resolved,
+        radius_km=radius_km,
+        limit=limit,
+        sort=sort,
+        year=year,
+    )
+    codes = [ref.drg_code for ref in resolved]
+    label = ", ".join(f"DRG {c}" for c in codes)
+    if not comparisons:
+        answer = f"No providers billing {label} found within {radius_km:.0f} km of {zipc}."
+    else:
+        top = comparisons[0]
+        if sort == "rating" and top.avg_rating is not None:
+            answer = f"For {label} near {zipc}, {top.provider_name} (rating: {top.avg_rating:.1f}/10) is a top option."
+        elif top.total_covered_charges is not None:
+            answer = (
+                f"For {label} near {zipc}, {top.provider_name} offers {top.drgs_offered} of {len(codes)}"
+                f" with combined avg covered charges ${top.total_covered_charges:,.0f}."
+            )
+        else:
+            answer = f"For {label} near {zipc}, {top.provider_name} offers {top.drgs_offered} of {len(codes)}."
+
+    return AskResult(
+        answer=answer,
+        intent=intent,
+        drg_codes=codes,
+        zip=zipc,
+        radius_km=radius_km,
+        year=year,
+        limit=limit,
+        sort=sort,
+        comparisons=comparisons,
+    )
@@ -0,0 +1,65 @@
+from typing import Optional
+
+import sqlalchemy as sa
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_db_session
+from app.schemas.drgs import DRGStats, PriceStats, StatSummary
+
+
+router = APIRouter(prefix="/drgs", tags=["drgs"])
+
+
+def _summary(row, prefix: str) -> StatSummary:
+    values = {}
+    for name in ("min", "p10", "median", "p90", "mean"):
+        v = getattr(row, f"{prefix}_{name}")
+        values[name] = float(v) if v is not None else None
+    return StatSummary(**values)
+
+
+@router.get("/{code}/stats", response_model=DRGStats)
+async def drg_stats(
+    code: int,
+    year: Optional[int] = Query(None, ge=1900, le=2100, description="CMS data year; defaults to the latest loaded"),
+    state: Optional[str] = Query(None, min_length=2, max_length=2, description="Only return this state's row"),
+    session: AsyncSession = Depends(get_read_db_session),
+):
+    # Served entirely from the ETL-maintained drg_price_stats rows; no aggregation over prices
+    query = sa.text(
+        """
+        SELECT s.*, d.description AS drg_description
+        FROM drg_price_stats s
+        JOIN drgs d ON d.code = s.drg_code
+        WHERE s.drg_code = :code
+          AND s.year = COALESCE(
+                CAST(:year AS integer),
+                (SELECT max(year) FROM drg_price_stats WHERE drg_code = :code)
+          )
+          AND (s.scope <> 'state' OR CAST(:state AS text) IS NULL OR s.scope_value = :state)
+        ORDER BY s.scope, s.scope_value
+        """
+    )
+    rows = (
+        await session.execute(query, {"code": code, "year": year, "state": state.upper() if state else None})
+    ).fetchall()
+    if not rows:
+        raise HTTPException(status_code=404, detail="No statistics for this DRG")
+
+    result = DRGStats(drg_code=code, drg_description=rows[0].drg_description, year=int(rows[0].year))
+    for r in rows:
+        stats = PriceStats(
+            scope=r.scope,
+            scope_value=r.scope_value,
+            provider_count=r.provider_count,
+            covered_charges=_summary(r, "covered_charges"),
+            total_payments=_summary(r, "total_payments"),
+        )
+        if r.scope == "national":
+            result.national = stats
+        elif r.scope == "region":
+            result.regions.append(stats)
+        else:
+            result.states.append(stats)
+    return result
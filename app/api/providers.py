@@ -1,11 +1,20 @@
-from typing import List
+from typing import List, Optional
 
 import sqlalchemy as sa
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db_session
-from app.schemas.providers import ProviderResult
+from app.db.session import get_read_db_session
+from app.schemas.providers import ComparisonResult, PriceTrendPoint, ProviderProfile, ProviderResult, ProviderTrend
+from app.services.search import (
+    MAX_COMPARE_DRGS,
+    collapsed_drg_terms,
+    compare_providers,
+    find_zip_centroid,
+    resolve_drg_codes,
+    resolve_drg_terms,
+    search_providers,
+)
 
 
 router = APIRouter(prefix="/providers", tags=["providers"])
@@ -18,101 +27,139 @@ async def list_providers(
     radius_km: float = Query(40.0, ge=1.0, le=200.0),
     limit: int = Query(20, ge=1, le=100),
     sort: str = Query("cost", pattern="^(cost|rating)$"),
-    session: AsyncSession = Depends(get_db_session),
+    year: Optional[int] = Query(None, ge=1900, le=2100, description="CMS data year; defaults to the latest loaded per DRG"),
+    percentile: bool = Query(False, description="Include each price's national covered-charges percentile"),
+    session: AsyncSession = Depends(get_read_db_session),
 ):
     # ZIP centroid
-    zip_row = (
-        await session.execute(
-            sa.text("SELECT latitude, longitude FROM zip_codes WHERE zip = :zip"),
-            {"zip": zip.zfill(5)},
-        )
-    ).first()
+    zip_row = await find_zip_centroid(session, zip.zfill(5))
     if not zip_row:
         raise HTTPException(status_code=404, detail="ZIP not found")
     lat0, lon0 = zip_row
 
-    # DRG code vs description
-    try:
-        drg_code = int(drg)
-        drg_filter_sql = "d.code = :drg_code"
-        drg_params = {"drg_code": drg_code}
-    except ValueError:
-        drg_filter_sql = "d.description ILIKE :drg_text"
-        drg_params = {"drg_text": f"%{drg}%"}
+    drg_codes = await resolve_drg_codes(session, drg)
+    if not drg_codes:
+        return []
 
-    order_sql = "pr.average_covered_charges ASC"
-    if sort == "rating":
-        order_sql = "avg_rating DESC NULLS LAST, pr.average_covered_charges ASC"
+    return await search_providers(
+        session,
+        lat0=lat0,
+        lon0=lon0,
+        drg_codes=drg_codes,
+        radius_km=radius_km,
+        limit=limit,
+        sort=sort,
+        year=year,
+        with_percentile=percentile,
+    )
 
-    query = sa.text(
-        f"""
-        WITH origin AS (
-            SELECT CAST(:lat0 AS numeric) AS lat0, CAST(:lon0 AS numeric) AS lon0
+
+@router.get("/compare", response_model=ComparisonResult)
+async def compare(
+    drg: List[str] = Query(..., description="Repeat for each DRG code (e.g., 470) or description text"),
+    zip: str = Query(..., description="ZIP code"),
+    radius_km: float = Query(40.0, ge=1.0, le=200.0),
+    limit: int = Query(20, ge=1, le=100),
+    sort: str = Query("cost", pattern="^(cost|rating)$"),
+    year: Optional[int] = Query(None, ge=1900, le=2100, description="CMS data year; defaults to the latest loaded per DRG"),
+    require_all: bool = Query(False, description="Only providers that bill every requested DRG"),
+    session: AsyncSession = Depends(get_read_db_session),
+):
+    if len(drg) > MAX_COMPARE_DRGS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_COMPARE_DRGS} DRGs can be compared")
+
+    zip_row = await find_zip_centroid(session, zip.zfill(5))
+    if not zip_row:
+        raise HTTPException(status_code=404, detail="ZIP not found")
+    lat0, lon0 = zip_row
+
+    resolved = await resolve_drg_terms(session, drg)
+    missing = [drg[i] for i, ref in enumerate(resolved) if ref is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"DRG not found: {', '.join(missing)}")
+    collapsed = collapsed_drg_terms(drg, resolved)
+    if collapsed:
+        raise HTTPException(status_code=422, detail=collapsed)
+
+    providers = await compare_providers(
+        session,
+        lat0=lat0,
+        lon0=lon0,
+        drgs=resolved,
+        radius_km=radius_km,
+        limit=limit,
+        sort=sort,
+        year=year,
+        require_all=require_all,
+    )
+    return ComparisonResult(drgs=resolved, providers=providers)
+
+
+# Declared after /compare so that path is not captured as a provider_id
+@router.get("/{provider_id}", response_model=ProviderProfile)
+async def provider_profile(provider_id: str, session: AsyncSession = Depends(get_read_db_session)):
+    # One primary-key lookup on the ETL-built document. Postgres renders the JSON and it is sent
+    # as-is, skipping decode/validate/encode of hundreds of DRG entries for large providers.
+    profile = (
+        await session.execute(
+            sa.text("SELECT profile::text FROM provider_profiles WHERE provider_id = :provider_id"),
+            {"provider_id": provider_id},
         )
-        SELECT 
+    ).scalar()
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Provider not found")
+    return Response(content=profile, media_type="application/json")
+
+
+@router.get("/{provider_id}/trend", response_model=ProviderTrend)
+async def provider_trend(
+    provider_id: str,
+    drg: Optional[str] = Query(None, description="Restrict to a DRG code or description text"),
+    session: AsyncSession = Depends(get_read_db_session),
+):
+    drg_codes = await resolve_drg_codes(session, drg) if drg else None
+    if drg_codes == []:
+        raise HTTPException(status_code=404, detail="DRG not found")
+
+    # LEFT JOIN so a provider without matching prices still yields its header row (404 only if unknown)
+    query = sa.text(
+        """
+        SELECT
             p.provider_id,
             p.provider_name,
-            p.provider_city,
-            p.provider_state,
-            p.provider_zip_code,
-            d.code AS drg_code,
+            pr.drg_code,
             d.description AS drg_description,
+            pr.year,
+            pr.total_discharges,
             pr.average_covered_charges,
             pr.average_total_payments,
-            pr.average_medicare_payments,
-            AVG(sr.rating) AS avg_rating,
-            2 * 6371 * asin(
-                sqrt(
-                    power(sin(radians((p.latitude - o.lat0)) / 2), 2) +
-                    cos(radians(o.lat0)) * cos(radians(p.latitude)) *
-                    power(sin(radians((p.longitude - o.lon0)) / 2), 2)
-                )
-            ) AS distance_km
+            pr.average_medicare_payments
         FROM providers p
-        JOIN prices pr ON pr.provider_id = p.id
-        JOIN drgs d ON d.code = pr.drg_code
-        JOIN origin o ON TRUE
-        LEFT JOIN star_ratings sr ON sr.provider_id = p.id
-        WHERE p.latitude IS NOT NULL AND p.longitude IS NOT NULL
-          AND {drg_filter_sql}
-        GROUP BY p.provider_id, p.provider_name, p.provider_city, p.provider_state, p.provider_zip_code,
-                 d.code, d.description, pr.average_covered_charges, pr.average_total_payments, pr.average_medicare_payments,
-                 o.lat0, o.lon0, p.latitude, p.longitude
-        HAVING 2 * 6371 * asin(
-                sqrt(
-                    power(sin(radians((p.latitude - o.lat0)) / 2), 2) +
-                    cos(radians(o.lat0)) * cos(radians(p.latitude)) *
-                    power(sin(radians((p.longitude - o.lon0)) / 2), 2)
-                )
-            ) <= :radius_km
-        ORDER BY {order_sql}
-        LIMIT :limit
+        LEFT JOIN prices pr
+          ON pr.provider_id = p.id
+         AND (CAST(:drg_codes AS integer[]) IS NULL OR pr.drg_code = ANY(:drg_codes))
+        LEFT JOIN drgs d ON d.code = pr.drg_code
+        WHERE p.provider_id = :provider_id
+        ORDER BY pr.drg_code, pr.year
         """
     )
+    rows = (await session.execute(query, {"provider_id": provider_id, "drg_codes": drg_codes})).fetchall()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Provider not found")
 
-    result = await session.execute(
-        query,
-        {"lat0": lat0, "lon0": lon0, "radius_km": radius_km, "limit": limit, **drg_params},
-    )
-    rows = result.fetchall()
-    output: list[ProviderResult] = []
+    points: list[PriceTrendPoint] = []
     for r in rows:
-        output.append(
-            ProviderResult(
-                provider_id=r.provider_id,
-                provider_name=r.provider_name,
-                provider_city=r.provider_city,
-                provider_state=r.provider_state,
-                provider_zip_code=r.provider_zip_code,
-                distance_km=float(r.distance_km),
+        if r.drg_code is None:
+            continue
+        points.append(
+            PriceTrendPoint(
                 drg_code=int(r.drg_code),
                 drg_description=r.drg_description,
+                year=int(r.year),
+                total_discharges=r.total_discharges,
                 average_covered_charges=float(r.average_covered_charges) if r.average_covered_charges is not None else None,
                 average_total_payments=float(r.average_total_payments) if r.average_total_payments is not None else None,
                 average_medicare_payments=float(r.average_medicare_payments) if r.average_medicare_payments is not None else None,
-                avg_rating=float(r.avg_rating) if r.avg_rating is not None else None,
             )
         )
-    return output
-
-
+    return ProviderTrend(provider_id=rows[0].provider_id, provider_name=rows[0].provider_name, points=points)
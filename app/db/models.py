@@ -15,6 +15,7 @@ from sqlalchemy import (
     UniqueConstraint,
     func,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -49,19 +50,32 @@ class DRG(Base):
 class Price(Base):
     __tablename__ = "prices"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Hash-partitioned on drg_code, so the partition key is part of the primary key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     provider_id: Mapped[int] = mapped_column(ForeignKey("providers.id"), nullable=False, index=True)
-    drg_code: Mapped[int] = mapped_column(ForeignKey("drgs.code"), nullable=False, index=True)
+    drg_code: Mapped[int] = mapped_column(ForeignKey("drgs.code"), primary_key=True, index=True)
+    year: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    source_file: Mapped[str | None] = mapped_column(String(255))
     total_discharges: Mapped[int | None] = mapped_column(Integer)
     average_covered_charges: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
     average_total_payments: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
     average_medicare_payments: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    # National percentile (0-100) of average_covered_charges within the DRG/year; maintained by the ETL
+    charges_percentile: Mapped[Decimal | None] = mapped_column(Numeric(5, 2))
 
     provider: Mapped[Provider] = relationship("Provider", back_populates="prices")
     drg: Mapped[DRG] = relationship("DRG", back_populates="prices")
 
     __table_args__ = (
-        Index("ix_prices_drg_cost", "drg_code", "average_covered_charges"),
+        UniqueConstraint("provider_id", "drg_code", "year", name="uq_prices_provider_drg_year"),
+        Index(
+            "ix_prices_drg_year_cost",
+            "drg_code",
+            "year",
+            "average_covered_charges",
+            postgresql_include=["provider_id", "average_total_payments", "average_medicare_payments", "total_discharges"],
+        ),
+        {"postgresql_partition_by": "HASH (drg_code)"},
     )
 
 
@@ -96,3 +110,48 @@ class ZipCode(Base):
     )
 
 
+class StateRegion(Base):
+    __tablename__ = "state_regions"
+
+    state: Mapped[str] = mapped_column(String(2), primary_key=True)
+    region: Mapped[str] = mapped_column(String(16), nullable=False)
+
+
+class DRGPriceStat(Base):
+    """Precomputed price distribution per DRG/year for the nation, each census region and each state."""
+
+    __tablename__ = "drg_price_stats"
+
+    drg_code: Mapped[int] = mapped_column(ForeignKey("drgs.code"), primary_key=True)
+    year: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    scope: Mapped[str] = mapped_column(String(8), primary_key=True)
+    scope_value: Mapped[str] = mapped_column(String(16), primary_key=True)
+    provider_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    covered_charges_min: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    covered_charges_p10: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    covered_charges_median: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    covered_charges_p90: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    covered_charges_mean: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    total_payments_min: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    total_payments_p10: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    total_payments_median: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    total_payments_p90: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    total_payments_mean: Mapped[Decimal | None] = mapped_column(Numeric(12, 2))
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("scope IN ('national', 'region', 'state')", name="ck_drg_price_stats_scope"),
+    )
+
+
+class ProviderProfile(Base):
+    """ETL-maintained JSONB document per provider served as-is by GET /providers/{provider_id}."""
+
+    __tablename__ = "provider_profiles"
+
+    provider_id: Mapped[str] = mapped_column(
+        String(16), ForeignKey("providers.provider_id", ondelete="CASCADE"), primary_key=True
+    )
+    profile: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    drg_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), server_default=func.now(), nullable=False)
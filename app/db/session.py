@@ -1,7 +1,8 @@
+import itertools
 import os
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Iterator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 
 def get_database_url() -> str:
@@ -12,12 +13,123 @@ def get_database_url() -> str:
     )
 
 
-ASYNC_ENGINE = create_async_engine(get_database_url(), future=True, echo=False)
-ASYNC_SESSION_MAKER = async_sessionmaker(ASYNC_ENGINE, expire_on_commit=False)
+def get_read_database_urls() -> list[str]:
+    # Comma-separated replica URLs; when unset, reads go to the primary
+    raw = os.getenv("DATABASE_READ_URLS", "")
+    return [url.strip() for url in raw.split(",") if url.strip()]
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_engine_options() -> dict[str, Any]:
+    """
+    Pool and asyncpg statement-cache settings shared by the primary and replica engines.
+    Defaults match SQLAlchemy/asyncpg defaults; set the *_CACHE_SIZE vars to 0 behind pgbouncer (transaction mode).
+    """
+    return {
+        "future": True,
+        "echo": False,
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_float("DB_POOL_TIMEOUT", 30.0),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", -1),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", False),
+        "connect_args": {
+            # asyncpg's own per-connection prepared statement LRU
+            "statement_cache_size": _env_int("DB_STATEMENT_CACHE_SIZE", 100),
+            # SQLAlchemy asyncpg adapter cache of prepared statement handles
+            "prepared_statement_cache_size": _env_int("DB_PREPARED_STATEMENT_CACHE_SIZE", 100),
+        },
+    }
+
+
+# Engines are created on first use rather than at import, so importing the app (or a
+# script that only needs the models) does not pull in the asyncpg dialect.
+_engine: Optional[AsyncEngine] = None
+_session_maker: Optional[async_sessionmaker[AsyncSession]] = None
+_read_engines: Optional[list[AsyncEngine]] = None
+_read_rotation: Optional[Iterator[async_sessionmaker[AsyncSession]]] = None
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(get_database_url(), **get_engine_options())
+    return _engine
+
+
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    global _session_maker
+    if _session_maker is None:
+        _session_maker = async_sessionmaker(get_engine(), expire_on_commit=False)
+    return _session_maker
+
+
+def get_read_engines() -> list[AsyncEngine]:
+    global _read_engines
+    if _read_engines is None:
+        _read_engines = [create_async_engine(url, **get_engine_options()) for url in get_read_database_urls()]
+    return _read_engines
+
+
+def get_read_session_makers() -> list[async_sessionmaker[AsyncSession]]:
+    makers = [async_sessionmaker(engine, expire_on_commit=False) for engine in get_read_engines()]
+    return makers or [get_session_maker()]
+
+
+def _next_read_session_maker() -> async_sessionmaker[AsyncSession]:
+    global _read_rotation
+    if _read_rotation is None:
+        _read_rotation = itertools.cycle(get_read_session_makers())
+    return next(_read_rotation)
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
-    async with ASYNC_SESSION_MAKER() as session:
+    async with get_session_maker()() as session:
         yield session
 
 
+async def get_read_db_session() -> AsyncGenerator[AsyncSession, None]:
+    # Round-robin across replicas for read-only queries; writes (ETL) stay on the primary
+    async with _next_read_session_maker()() as session:
+        yield session
+
+
+def _pool_stats(role: str, engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.pool
+    return {
+        "role": role,
+        "url": engine.url.render_as_string(hide_password=True),
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def get_pool_stats() -> list[dict[str, Any]]:
+    stats = [_pool_stats("primary", get_engine())]
+    stats.extend(_pool_stats("replica", engine) for engine in get_read_engines())
+    return stats
+
+
+async def dispose_engines() -> None:
+    global _engine, _session_maker, _read_engines, _read_rotation
+    for engine in ([_engine] if _engine is not None else []) + (_read_engines or []):
+        await engine.dispose()
+    _engine = _session_maker = _read_engines = _read_rotation = None
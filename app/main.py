@@ -1,9 +1,28 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Response
 from app.api.providers import router as providers_router
 from app.api.ask import router as ask_router
+from app.api.drgs import router as drgs_router
+from app.db.session import dispose_engines, get_pool_stats
+from app.services.warmup import warm_up_status, warm_up_until_ready
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the server accepts /health and /ready immediately
+    warm_task = asyncio.create_task(warm_up_until_ready())
+    try:
+        yield
+    finally:
+        warm_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await warm_task
+        await dispose_engines()
 
 
-app = FastAPI(title="Healthcare Cost Navigator")
+app = FastAPI(title="Healthcare Cost Navigator", lifespan=lifespan)
 
 
 @app.get("/health")
@@ -11,7 +30,19 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
-app.include_router(providers_router)
-app.include_router(ask_router)
+@app.get("/ready")
+async def ready(response: Response) -> dict:
+    status = warm_up_status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
 
 
+@app.get("/health/pool")
+async def pool_health() -> dict:
+    return {"pools": get_pool_stats()}
+
+
+app.include_router(providers_router)
+app.include_router(ask_router)
+app.include_router(drgs_router)
@@ -1,7 +1,7 @@
 from typing import List, Optional
 from pydantic import BaseModel
 
-from .providers import ProviderResult
+from .providers import ProviderComparison, ProviderResult
 
 
 class AskRequest(BaseModel):
@@ -12,11 +12,14 @@ class AskResult(BaseModel):
     answer: str
     intent: str
     drg_code: Optional[int] = None
+    drg_codes: List[int] = []
     drg_text: Optional[str] = None
     zip: Optional[str] = None
     radius_km: Optional[float] = None
+    year: Optional[int] = None
     limit: int = 5
     sort: str = "cost"
     results: List[ProviderResult] = []
+    comparisons: List[ProviderComparison] = []
 
 
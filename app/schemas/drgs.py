@@ -0,0 +1,28 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class StatSummary(BaseModel):
+    min: Optional[float] = None
+    p10: Optional[float] = None
+    median: Optional[float] = None
+    p90: Optional[float] = None
+    mean: Optional[float] = None
+
+
+class PriceStats(BaseModel):
+    scope: str = Field(description="national, region or state")
+    scope_value: str = Field(description="US, census region name or state abbreviation")
+    provider_count: int
+    covered_charges: StatSummary
+    total_payments: StatSummary
+
+
+class DRGStats(BaseModel):
+    drg_code: int
+    drg_description: str
+    year: int
+    national: Optional[PriceStats] = None
+    regions: List[PriceStats] = []
+    states: List[PriceStats] = []
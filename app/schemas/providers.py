@@ -1,5 +1,6 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class ProviderResult(BaseModel):
@@ -11,9 +12,13 @@ class ProviderResult(BaseModel):
     distance_km: float
     drg_code: int
     drg_description: str
+    year: Optional[int] = Field(default=None, description="CMS data year of the prices")
     average_covered_charges: Optional[float] = None
     average_total_payments: Optional[float] = None
     average_medicare_payments: Optional[float] = None
+    charges_percentile: Optional[float] = Field(
+        default=None, description="National percentile (0-100) of covered charges for this DRG and year"
+    )
     avg_rating: Optional[float] = Field(default=None, description="Average star rating 1-10")
 
 
@@ -23,5 +28,80 @@ class ProviderQuery(BaseModel):
     radius_km: float = 40.0
     limit: int = 20
     sort: str = Field(default="cost", description="cost or rating")
+    year: Optional[int] = None
 
 
+class PriceTrendPoint(BaseModel):
+    drg_code: int
+    drg_description: str
+    year: int
+    total_discharges: Optional[int] = None
+    average_covered_charges: Optional[float] = None
+    average_total_payments: Optional[float] = None
+    average_medicare_payments: Optional[float] = None
+
+
+class ProviderTrend(BaseModel):
+    provider_id: str
+    provider_name: str
+    points: List[PriceTrendPoint] = []
+
+
+class ProviderDRGPrice(BaseModel):
+    drg_code: int
+    drg_description: str
+    year: int = Field(description="Latest CMS data year loaded for this provider and DRG")
+    total_discharges: Optional[int] = None
+    average_covered_charges: Optional[float] = None
+    average_total_payments: Optional[float] = None
+    average_medicare_payments: Optional[float] = None
+    charges_percentile: Optional[float] = Field(
+        default=None, description="National percentile (0-100) of covered charges for this DRG and year"
+    )
+
+
+class ProviderProfile(BaseModel):
+    provider_id: str
+    provider_name: str
+    provider_city: str
+    provider_state: str
+    provider_zip_code: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    avg_rating: Optional[float] = Field(default=None, description="Average star rating 1-10")
+    rating_count: int = 0
+    drg_count: int = 0
+    refreshed_at: datetime = Field(description="When the ETL last rebuilt this profile")
+    drgs: List[ProviderDRGPrice] = Field(default=[], description="Every DRG billed, by code")
+
+
+class DRGRef(BaseModel):
+    term: str = Field(description="DRG code or description text as requested")
+    drg_code: int
+    drg_description: str
+
+
+class DRGPrice(BaseModel):
+    drg_code: int
+    year: int
+    average_covered_charges: Optional[float] = None
+    average_total_payments: Optional[float] = None
+    average_medicare_payments: Optional[float] = None
+
+
+class ProviderComparison(BaseModel):
+    provider_id: str
+    provider_name: str
+    provider_city: str
+    provider_state: str
+    provider_zip_code: str
+    distance_km: float
+    avg_rating: Optional[float] = Field(default=None, description="Average star rating 1-10")
+    drgs_offered: int = Field(description="How many of the requested DRGs this provider bills")
+    total_covered_charges: Optional[float] = Field(default=None, description="Sum of covered charges over the offered DRGs")
+    prices: List[Optional[DRGPrice]] = Field(default=[], description="One entry per requested DRG, in request order; null if not billed")
+
+
+class ComparisonResult(BaseModel):
+    drgs: List[DRGRef]
+    providers: List[ProviderComparison] = []
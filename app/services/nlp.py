@@ -1,28 +1,41 @@
 import os
 import re
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from openai import AsyncOpenAI
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
 
+@lru_cache(maxsize=1)
+def get_openai_client(api_key: str) -> "AsyncOpenAI":
+    # The SDK is slow to import; load it on the first LLM call and reuse the client (and its HTTP pool)
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=api_key)
+
+
 async def parse_question(question: str) -> Dict[str, Any]:
     """
     Use OpenAI to parse NL into structured intent. Fallback to simple regex if API not configured.
-    Returns keys: intent (cheapest|best_ratings|info), drg_code?, drg_text?, zip?, radius_km?, limit?, sort?
+    Returns keys: intent (cheapest|best_ratings|compare|info), drg_code?, drg_text?, drg_terms?, zip?, radius_km?, year?, limit?, sort?
     """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return fallback_parse(question)
 
-    client = AsyncOpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
     system = (
         "You translate patient questions about hospital pricing and ratings into a strict JSON object."
-        " Only include the fields you can infer. Use {intent, drg_code, drg_text, zip, radius_km, limit, sort}."
-        " intent must be one of: cheapest, best_ratings, info. sort is cost or rating."
+        " Only include the fields you can infer. Use {intent, drg_code, drg_text, drg_terms, zip, radius_km, year, limit, sort}."
+        " intent must be one of: cheapest, best_ratings, compare, info. sort is cost or rating."
+        " When the question names more than one procedure or DRG, set intent=compare and put each one,"
+        " as a DRG code string or short description, in the drg_terms list."
         " Default radius_km to 40 and limit to 5 if not specified."
+        " Only set year (4-digit CMS data year) when the question names one."
         " If the question is out of scope (not about hospitals, DRG, pricing, cost, rating), set intent=info."
     )
     user = f"Question: {question}\nReturn ONLY compact JSON."
@@ -50,9 +63,22 @@ def fallback_parse(question: str) -> Dict[str, Any]:
     q = question.lower()
     intent = "cheapest" if ("cheapest" in q or "lowest" in q) else ("best_ratings" if "best" in q or "rating" in q else "info")
     drg_code: Optional[int] = None
-    m = re.search(r"drg\s*(\d{3})", q)
-    if m:
-        drg_code = int(m.group(1))
+    codes = re.findall(r"drg\s*(\d{3})", q)
+    if codes:
+        drg_code = int(codes[0])
+    # "compare hip replacement and heart failure near 10019", "compare DRG 470 vs DRG 469 ..."
+    drg_terms: list[str] = []
+    if len(codes) > 1:
+        drg_terms = codes
+    else:
+        mcmp = re.search(r"compare\s+(.+?)\s+(?:near|around|within|in|at|for)\b", q)
+        if mcmp:
+            drg_terms = [t.strip() for t in re.split(r",|\band\b|\bvs\.?|\bversus\b", mcmp.group(1)) if t.strip()]
+            drg_terms = [t.removeprefix("drg").strip() for t in drg_terms]
+    if len(drg_terms) > 1:
+        intent = "compare"
+    else:
+        drg_terms = []
     mzip = re.search(r"(\b\d{5}\b)", q)
     zipc = mzip.group(1) if mzip else None
     mrad = re.search(r"(\d{1,3})\s*(miles|mi|mile)", q)
@@ -60,13 +86,17 @@ def fallback_parse(question: str) -> Dict[str, Any]:
     if mrad:
         miles = float(mrad.group(1))
         radius_km = miles * 1.60934
+    myear = re.search(r"\b(?:in|for|year)\s+((?:19|20)\d{2})\b", q)
+    year = int(myear.group(1)) if myear else None
     return {
         "intent": intent,
         "drg_code": drg_code,
         "zip": zipc,
         "radius_km": radius_km or 40.0,
+        "year": year,
+        "drg_terms": drg_terms,
         "limit": 5,
-        "sort": "cost" if intent != "best_ratings" else "rating",
+        "sort": "rating" if intent == "best_ratings" or (intent == "compare" and ("best" in q or "rating" in q)) else "cost",
     }
 
 
@@ -0,0 +1,328 @@
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.providers import DRGPrice, DRGRef, ProviderComparison, ProviderResult
+from app.services.snapshot import get_snapshot
+
+
+# Upper bound on DRGs per comparison; each adds four pivot columns to the query
+MAX_COMPARE_DRGS = 10
+
+
+async def find_zip_centroid(session: AsyncSession, zipc: str) -> Optional[tuple]:
+    # Served from the shared mmap snapshot when one is published; the DB covers misses
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        centroid = snapshot.zip_centroid(zipc)
+        if centroid is not None:
+            return centroid
+    return (
+        await session.execute(sa.text("SELECT latitude, longitude FROM zip_codes WHERE zip = :zip"), {"zip": zipc})
+    ).first()
+
+
+async def resolve_drg_codes(session: AsyncSession, drg: str) -> list[int]:
+    """
+    DRG code vs description. Descriptions are resolved to codes up front so the prices
+    lookup filters on the partition key and only scans the matching partitions.
+    """
+    try:
+        return [int(drg)]
+    except ValueError:
+        pass
+    rows = (
+        await session.execute(
+            sa.text("SELECT code FROM drgs WHERE description ILIKE :drg_text"),
+            {"drg_text": f"%{drg}%"},
+        )
+    ).fetchall()
+    return [int(r.code) for r in rows]
+
+
+async def search_providers(
+    session: AsyncSession,
+    *,
+    lat0,
+    lon0,
+    drg_codes: list[int],
+    radius_km: float,
+    limit: int,
+    sort: str,
+    year: Optional[int] = None,
+    with_percentile: bool = False,
+) -> list[ProviderResult]:
+    """
+    Providers within radius_km of (lat0, lon0) billing any of drg_codes.
+    Without a year, each DRG uses its latest loaded year: max(year) per DRG is a
+    backward probe on ix_prices_drg_year_cost, so this costs the same as a single-year table.
+    with_percentile reads the ETL-maintained prices.charges_percentile; it is off by default
+    because that column is not in the covering index.
+    """
+    percentile_sql = "pr.charges_percentile" if with_percentile else "CAST(NULL AS numeric)"
+    percentile_group_sql = ", pr.charges_percentile" if with_percentile else ""
+    order_sql = "pr.average_covered_charges ASC"
+    if sort == "rating":
+        order_sql = "avg_rating DESC NULLS LAST, pr.average_covered_charges ASC"
+
+    query = sa.text(
+        f"""
+        WITH origin AS (
+            SELECT CAST(:lat0 AS numeric) AS lat0, CAST(:lon0 AS numeric) AS lon0
+        ),
+        target AS (
+            SELECT c.code AS drg_code, COALESCE(CAST(:year AS integer), latest.year) AS year
+            FROM unnest(CAST(:drg_codes AS integer[])) AS c(code)
+            CROSS JOIN LATERAL (
+                SELECT max(px.year) AS year FROM prices px WHERE px.drg_code = c.code
+            ) latest
+        )
+        SELECT
+            p.provider_id,
+            p.provider_name,
+            p.provider_city,
+            p.provider_state,
+            p.provider_zip_code,
+            d.code AS drg_code,
+            d.description AS drg_description,
+            pr.year,
+            pr.average_covered_charges,
+            pr.average_total_payments,
+            pr.average_medicare_payments,
+            {percentile_sql} AS charges_percentile,
+            AVG(sr.rating) AS avg_rating,
+            2 * 6371 * asin(
+                sqrt(
+                    power(sin(radians((p.latitude - o.lat0)) / 2), 2) +
+                    cos(radians(o.lat0)) * cos(radians(p.latitude)) *
+                    power(sin(radians((p.longitude - o.lon0)) / 2), 2)
+                )
+            ) AS distance_km
+        FROM providers p
+        JOIN prices pr ON pr.provider_id = p.id
+        JOIN target t ON t.drg_code = pr.drg_code AND t.year = pr.year
+        JOIN drgs d ON d.code = pr.drg_code
+        JOIN origin o ON TRUE
+        LEFT JOIN star_ratings sr ON sr.provider_id = p.id
+        WHERE p.latitude IS NOT NULL AND p.longitude IS NOT NULL
+          AND pr.drg_code = ANY(:drg_codes)
+        GROUP BY p.provider_id, p.provider_name, p.provider_city, p.provider_state, p.provider_zip_code,
+                 d.code, d.description, pr.year, pr.average_covered_charges, pr.average_total_payments,
+                 pr.average_medicare_payments{percentile_group_sql}, o.lat0, o.lon0, p.latitude, p.longitude
+        HAVING 2 * 6371 * asin(
+                sqrt(
+                    power(sin(radians((p.latitude - o.lat0)) / 2), 2) +
+                    cos(radians(o.lat0)) * cos(radians(p.latitude)) *
+                    power(sin(radians((p.longitude - o.lon0)) / 2), 2)
+                )
+            ) <= :radius_km
+        ORDER BY {order_sql}
+        LIMIT :limit
+        """
+    )
+
+    result = await session.execute(
+        query,
+        {
+            "lat0": lat0,
+            "lon0": lon0,
+            "radius_km": radius_km,
+            "limit": limit,
+            "drg_codes": drg_codes,
+            "year": year,
+        },
+    )
+    rows = result.fetchall()
+    output: list[ProviderResult] = []
+    for r in rows:
+        output.append(
+            ProviderResult(
+                provider_id=r.provider_id,
+                provider_name=r.provider_name,
+                provider_city=r.provider_city,
+                provider_state=r.provider_state,
+                provider_zip_code=r.provider_zip_code,
+                distance_km=float(r.distance_km),
+                drg_code=int(r.drg_code),
+                drg_description=r.drg_description,
+                year=int(r.year),
+                average_covered_charges=float(r.average_covered_charges) if r.average_covered_charges is not None else None,
+                average_total_payments=float(r.average_total_payments) if r.average_total_payments is not None else None,
+                average_medicare_payments=float(r.average_medicare_payments) if r.average_medicare_payments is not None else None,
+                charges_percentile=float(r.charges_percentile) if r.charges_percentile is not None else None,
+                avg_rating=float(r.avg_rating) if r.avg_rating is not None else None,
+            )
+        )
+    return output
+
+
+async def resolve_drg_terms(session: AsyncSession, terms: list[str]) -> list[Optional[DRGRef]]:
+    """
+    Resolve each DRG code or description term to one DRG, in request order and in one round trip.
+    A description term matches when every one of its words appears in the description (so
+    "hip replacement" finds "MAJOR HIP AND KNEE JOINT REPLACEMENT ..."); the lowest matching
+    code wins. Unresolvable terms come back as None.
+    """
+    query = sa.text(
+        """
+        SELECT q.term, d.code, d.description
+        FROM unnest(CAST(:terms AS text[])) WITH ORDINALITY AS q(term, ord)
+        LEFT JOIN LATERAL (
+            SELECT code, description
+            FROM drgs
+            WHERE CASE
+                WHEN q.term ~ '^[0-9]+$' THEN code = CAST(q.term AS integer)
+                ELSE description ILIKE ALL (
+                    SELECT '%' || w || '%' FROM regexp_split_to_table(q.term, '[[:space:]]+') AS w
+                )
+            END
+            ORDER BY code
+            LIMIT 1
+        ) d ON TRUE
+        ORDER BY q.ord
+        """
+    )
+    rows = (await session.execute(query, {"terms": [t.strip() for t in terms]})).fetchall()
+    return [
+        DRGRef(term=r.term, drg_code=int(r.code), drg_description=r.description) if r.code is not None else None
+        for r in rows
+    ]
+
+
+def collapsed_drg_terms(terms: list[str], refs: list[DRGRef]) -> Optional[str]:
+    """A message naming requested terms that resolved to the same DRG, or None when all are distinct."""
+    by_code: dict[int, list[str]] = {}
+    for term, ref in zip(terms, refs):
+        by_code.setdefault(ref.drg_code, []).append(term)
+    clashes = [f"{', '.join(repr(t) for t in dup)} all match DRG {code}" for code, dup in by_code.items() if len(dup) > 1]
+    if not clashes:
+        return None
+    return "; ".join(clashes) + ". Use more specific terms or DRG codes."
+
+
+async def compare_providers(
+    session: AsyncSession,
+    *,
+    lat0,
+    lon0,
+    drgs: list[DRGRef],
+    radius_km: float,
+    limit: int,
+    sort: str,
+    year: Optional[int] = None,
+    require_all: bool = False,
+) -> list[ProviderComparison]:
+    """
+    One row per provider within radius_km with its prices for every requested DRG side by side.
+    A single pass over prices filtered on drg_code = ANY(...) (partition-pruned), pivoted with
+    FILTER-ed aggregates per DRG. Providers billing more of the requested DRGs sort first.
+    """
+    drg_codes = [d.drg_code for d in drgs]
+    pivot_sql = ",\n".join(
+        f"""
+            MAX(pr.year) FILTER (WHERE pr.drg_code = :drg_{i}) AS year_{i},
+            MAX(pr.average_covered_charges) FILTER (WHERE pr.drg_code = :drg_{i}) AS covered_{i},
+            MAX(pr.average_total_payments) FILTER (WHERE pr.drg_code = :drg_{i}) AS total_{i},
+            MAX(pr.average_medicare_payments) FILTER (WHERE pr.drg_code = :drg_{i}) AS medicare_{i}"""
+        for i in range(len(drgs))
+    )
+    order_sql = "drgs_offered DESC, total_covered_charges ASC NULLS LAST"
+    if sort == "rating":
+        order_sql = "rt.avg_rating DESC NULLS LAST, " + order_sql
+    having_sql = "HAVING COUNT(DISTINCT pr.drg_code) = :drg_count" if require_all else ""
+
+    query = sa.text(
+        f"""
+        WITH origin AS (
+            SELECT CAST(:lat0 AS numeric) AS lat0, CAST(:lon0 AS numeric) AS lon0
+        ),
+        target AS (
+            SELECT c.code AS drg_code, COALESCE(CAST(:year AS integer), latest.year) AS year
+            FROM unnest(CAST(:drg_codes AS integer[])) AS c(code)
+            CROSS JOIN LATERAL (
+                SELECT max(px.year) AS year FROM prices px WHERE px.drg_code = c.code
+            ) latest
+        )
+        SELECT
+            p.provider_id,
+            p.provider_name,
+            p.provider_city,
+            p.provider_state,
+            p.provider_zip_code,
+            dist.distance_km,
+            rt.avg_rating,
+            COUNT(DISTINCT pr.drg_code) AS drgs_offered,
+            SUM(pr.average_covered_charges) AS total_covered_charges,
+            {pivot_sql}
+        FROM providers p
+        JOIN origin o ON TRUE
+        CROSS JOIN LATERAL (
+            SELECT 2 * 6371 * asin(
+                sqrt(
+                    power(sin(radians((p.latitude - o.lat0)) / 2), 2) +
+                    cos(radians(o.lat0)) * cos(radians(p.latitude)) *
+                    power(sin(radians((p.longitude - o.lon0)) / 2), 2)
+                )
+            ) AS distance_km
+        ) dist
+        JOIN prices pr ON pr.provider_id = p.id
+        JOIN target t ON t.drg_code = pr.drg_code AND t.year = pr.year
+        LEFT JOIN LATERAL (
+            SELECT AVG(sr.rating) AS avg_rating FROM star_ratings sr WHERE sr.provider_id = p.id
+        ) rt ON TRUE
+        WHERE p.latitude IS NOT NULL AND p.longitude IS NOT NULL
+          AND pr.drg_code = ANY(:drg_codes)
+          AND dist.distance_km <= :radius_km
+        GROUP BY p.id, p.provider_id, p.provider_name, p.provider_city, p.provider_state, p.provider_zip_code,
+                 dist.distance_km, rt.avg_rating
+        {having_sql}
+        ORDER BY {order_sql}
+        LIMIT :limit
+        """
+    )
+    params = {
+        "lat0": lat0,
+        "lon0": lon0,
+        "radius_km": radius_km,
+        "limit": limit,
+        "year": year,
+        "drg_codes": drg_codes,
+        "drg_count": len(set(drg_codes)),
+        **{f"drg_{i}": code for i, code in enumerate(drg_codes)},
+    }
+    rows = (await session.execute(query, params)).fetchall()
+
+    output: list[ProviderComparison] = []
+    for r in rows:
+        prices: list[Optional[DRGPrice]] = []
+        for i, drg in enumerate(drgs):
+            year_i = getattr(r, f"year_{i}")
+            if year_i is None:
+                prices.append(None)
+                continue
+            covered, total, medicare = (getattr(r, f"{k}_{i}") for k in ("covered", "total", "medicare"))
+            prices.append(
+                DRGPrice(
+                    drg_code=drg.drg_code,
+                    year=int(year_i),
+                    average_covered_charges=float(covered) if covered is not None else None,
+                    average_total_payments=float(total) if total is not None else None,
+                    average_medicare_payments=float(medicare) if medicare is not None else None,
+                )
+            )
+        output.append(
+            ProviderComparison(
+                provider_id=r.provider_id,
+                provider_name=r.provider_name,
+                provider_city=r.provider_city,
+                provider_state=r.provider_state,
+                provider_zip_code=r.provider_zip_code,
+                distance_km=float(r.distance_km),
+                avg_rating=float(r.avg_rating) if r.avg_rating is not None else None,
+                drgs_offered=int(r.drgs_offered),
+                total_covered_charges=float(r.total_covered_charges) if r.total_covered_charges is not None else None,
+                prices=prices,
+            )
+        )
+    return output
@@ -0,0 +1,117 @@
+"""
+Read-only, memory-mapped reference data snapshot shared by all API workers.
+
+The ETL writes one compact binary file (etl/snapshot.py) holding fixed-width arrays of
+ZIP centroids, which every /providers, /providers/compare and /ask request looks up.
+Each worker mmaps it read-only, so the pages live once in the OS page cache instead of
+once per worker heap, opening it costs only a header parse, and lookups bisect straight
+into the mapping without copying arrays. New sections are added (with a VERSION bump)
+only together with a request path that reads them.
+
+A new generation is published by writing a temp file and os.replace()-ing it over
+SNAPSHOT_PATH. Workers notice the new inode on their next periodic check and remap;
+the old mapping stays valid until its last reference is dropped.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+
+MAGIC = b"HCNSNAP\x01"
+# 2: provider and price sections dropped (nothing read them)
+VERSION = 2
+ALIGNMENT = 8
+
+# Section name → memoryview/array typecode. Order is the on-disk order.
+SECTIONS = [
+    ("zip_code", "i"),  # 5-digit ZIP as integer, sorted ascending
+    ("zip_lat", "d"),  # NaN where the centroid has no coordinates
+    ("zip_lon", "d"),
+]
+
+# magic, version, generation, created_at (unix seconds); then (offset, nbytes) per section
+HEADER = struct.Struct("<8sIQd")
+SECTION_ENTRY = struct.Struct("<QQ")
+
+
+def header_size() -> int:
+    size = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class Snapshot:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.identity = (st.st_dev, st.st_ino, st.st_mtime_ns)
+
+        magic, version, generation, created_at = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} snapshot")
+        self.generation = generation
+        self.created_at = created_at
+
+        # Zero-copy typed views over the mapping
+        buf = memoryview(self._mm)
+        self._views: dict[str, memoryview] = {}
+        for i, (name, typecode) in enumerate(SECTIONS):
+            offset, nbytes = SECTION_ENTRY.unpack_from(self._mm, HEADER.size + i * SECTION_ENTRY.size)
+            self._views[name] = buf[offset : offset + nbytes].cast(typecode)
+
+        self.zip_count = len(self._views["zip_code"])
+
+    def zip_centroid(self, zipc: str) -> Optional[tuple[float, float]]:
+        if not zipc.isdigit():
+            return None
+        codes = self._views["zip_code"]
+        target = int(zipc)
+        i = bisect_left(codes, target)
+        if i == len(codes) or codes[i] != target:
+            return None
+        lat, lon = self._views["zip_lat"][i], self._views["zip_lon"][i]
+        return None if lat != lat or lon != lon else (lat, lon)
+
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+# How often (seconds) a worker stats SNAPSHOT_PATH to pick up a newly published generation
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv("SNAPSHOT_CHECK_INTERVAL", "5"))
+
+_current: Optional[Snapshot] = None
+# None until the first check; rate-limits checks whether or not a snapshot is loaded
+_last_check: Optional[float] = None
+# (dev, ino, mtime_ns) of a file that failed to load, so it is not re-parsed until replaced
+_rejected: Optional[tuple[int, int, int]] = None
+_lock = threading.Lock()
+
+
+def get_snapshot() -> Optional[Snapshot]:
+    """The current snapshot for this worker, or None when SNAPSHOT_PATH is unset, missing or unreadable."""
+    global _current, _last_check, _rejected
+    if not SNAPSHOT_PATH:
+        return None
+    now = time.monotonic()
+    if _last_check is not None and now - _last_check < SNAPSHOT_CHECK_INTERVAL:
+        return _current
+    with _lock:
+        if _last_check is not None and now - _last_check < SNAPSHOT_CHECK_INTERVAL:
+            return _current
+        _last_check = now
+        try:
+            st = os.stat(SNAPSHOT_PATH)
+        except OSError:
+            return _current
+        identity = (st.st_dev, st.st_ino, st.st_mtime_ns)
+        if identity != _rejected and (_current is None or _current.identity != identity):
+            try:
+                _current = Snapshot(SNAPSHOT_PATH)
+            except (OSError, ValueError):
+                # Keep serving the previous generation (or the DB) if the new file is unreadable
+                _rejected = identity
+        return _current
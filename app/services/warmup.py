@@ -0,0 +1,69 @@
+"""
+Startup warm-up, run in the background by the app lifespan.
+
+Opens up to WARMUP_CONNECTIONS pooled connections per read engine and runs the hot queries once
+on each, so asyncpg has prepared (parsed/planned) them before real traffic arrives, then maps
+the shared snapshot. /ready reports 503 until this has succeeded once; /health stays a plain
+liveness check.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.session import get_read_session_makers
+from app.services.search import find_zip_centroid, resolve_drg_codes, resolve_drg_terms, search_providers
+from app.services.snapshot import get_snapshot
+
+
+# Connections to open per engine; defaults to the pool size so no request pays for a connect
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS") or os.getenv("DB_POOL_SIZE") or 5)
+# Seconds between attempts while the database is unreachable
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "2"))
+
+_status: dict[str, Any] = {"ready": False, "attempts": 0, "warmup_s": None, "error": None}
+
+
+def warm_up_status() -> dict[str, Any]:
+    return dict(_status)
+
+
+async def _prepare_hot_queries(session: AsyncSession) -> None:
+    # Same SQL text as live requests (default cost/rating sorts), with inputs that match nothing
+    await find_zip_centroid(session, "00000")
+    await resolve_drg_codes(session, "warm-up")
+    await resolve_drg_terms(session, ["warm-up"])
+    for sort in ("cost", "rating"):
+        await search_providers(session, lat0=0, lon0=0, drg_codes=[], radius_km=1.0, limit=1, sort=sort)
+
+
+async def _warm_connection(maker: async_sessionmaker[AsyncSession]) -> None:
+    async with maker() as session:
+        await _prepare_hot_queries(session)
+
+
+async def warm_up() -> None:
+    # Sessions run concurrently so each holds (and warms) a distinct pooled connection
+    await asyncio.gather(
+        *(_warm_connection(maker) for maker in get_read_session_makers() for _ in range(WARMUP_CONNECTIONS))
+    )
+    get_snapshot()
+
+
+async def warm_up_until_ready(retry_interval: Optional[float] = None) -> None:
+    """Retry warm_up() until it succeeds once; cancelled by the lifespan on shutdown."""
+    interval = WARMUP_RETRY_INTERVAL if retry_interval is None else retry_interval
+    started = time.perf_counter()
+    while True:
+        _status["attempts"] += 1
+        try:
+            await warm_up()
+        except Exception as exc:
+            _status["error"] = f"{type(exc).__name__}: {exc}"
+            await asyncio.sleep(interval)
+            continue
+        _status.update(ready=True, error=None, warmup_s=round(time.perf_counter() - started, 3))
+        return
@@ -0,0 +1,43 @@
+"""Helpers shared by the benchmark scripts: DB reset, ETL subprocess runs and run metadata."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Every table the ETL writes; truncated so each benchmark load starts from an empty schema
+ETL_TABLES = ["prices", "star_ratings", "providers", "drgs", "zip_codes"]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+async def reset_database(database_url: str) -> None:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    env = {**os.environ, "DATABASE_URL": database_url}
+    subprocess.run(["alembic", "upgrade", "head"], cwd=PROJECT_ROOT, env=env, check=True)
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {', '.join(ETL_TABLES)} RESTART IDENTITY CASCADE"))
+    await engine.dispose()
+
+
+def run_etl(database_url: str, prices_csv: Union[Path, str], zip_csv: Path, extra_args: Optional[list[str]] = None) -> None:
+    # prices_csv may be a glob or comma-separated list; see etl.etl.parse_price_files
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "CMS_CSV": str(prices_csv),
+        "ZIP_CSV": str(zip_csv),
+        "PYTHONPATH": str(PROJECT_ROOT),
+    }
+    subprocess.run([sys.executable, "-m", "etl.etl", *(extra_args or [])], cwd=PROJECT_ROOT, env=env, check=True)
@@ -1,22 +1,37 @@
+import argparse
 import asyncio
+import cProfile
 import csv
+import glob
+import json
 import os
 import random
 import re
+from dataclasses import dataclass, field
 from decimal import Decimal
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Provider, DRG, Price, StarRating, ZipCode
-from app.db.session import ASYNC_SESSION_MAKER
+from app.db.session import get_engine, get_session_maker
+from app.services.snapshot import SNAPSHOT_PATH
+from etl.profiling import EtlProfiler
+from etl.snapshot import write_snapshot
 
 
 DATA_CSV_PATH = os.getenv("CMS_CSV", "data/sample_prices_ny.csv")
 ZIP_CENTROIDS_PATH = os.getenv("ZIP_CSV", "data/zipcodes.csv")
+# Data year for files whose name carries none and that have no YEAR= prefix
+DEFAULT_DATA_YEAR = int(os.getenv("CMS_YEAR", "2022"))
+# Price files loaded at once, each on its own pooled connection; keep <= DB_POOL_SIZE + DB_MAX_OVERFLOW
+ETL_DB_CONNECTIONS = int(os.getenv("ETL_DB_CONNECTIONS", "4"))
+# per-file: concurrent loads, one transaction per file; single: the whole run in one transaction on one connection
+COMMIT_MODES = ("per-file", "single")
+ETL_COMMIT = os.getenv("ETL_COMMIT", "per-file")
 
 
 def parse_drg(ms_drg_definition: str) -> tuple[Optional[int], str]:
@@ -45,11 +60,6 @@ def first_nonempty(row: dict, keys: list[str]) -> Optional[str]:
 def clean_money(value: Optional[str]) -> Optional[Decimal]:
     if value is None:
         return None
-def clean_state(value: Optional[str]) -> str:
-    if not value:
-        return ""
-    return str(value).strip().upper()[:2]
-
     s = str(value).strip()
     if s == "":
         return None
@@ -61,7 +71,146 @@ def clean_state(value: Optional[str]) -> str:
         return None
 
 
-async def load_zip_centroids(session: AsyncSession, path: str) -> None:
+def clean_state(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return str(value).strip().upper()[:2]
+
+
+# asyncpg caps a statement at 32767 bind parameters; 5 columns per ZIP/provider row
+DIMENSION_BATCH_SIZE = 5000
+PRICE_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class PriceFile:
+    path: str
+    year: int
+
+
+@dataclass(frozen=True)
+class PriceRow:
+    prov_id: str
+    prov_name: str
+    prov_city: str
+    prov_state: str
+    prov_zip: str
+    drg_code: int
+    drg_desc: str
+    discharges: Optional[int]
+    avg_cov: Optional[Decimal]
+    avg_total: Optional[Decimal]
+    avg_medicare: Optional[Decimal]
+
+
+def infer_year(path: str) -> int:
+    # A 4-digit year anywhere in the file name, e.g. inpatient_ny_2021.csv
+    m = re.search(r"(?<!\d)((?:19|20)\d{2})(?!\d)", Path(path).name)
+    return int(m.group(1)) if m else DEFAULT_DATA_YEAR
+
+
+def parse_price_files(spec: str) -> list[PriceFile]:
+    """
+    Comma-separated CSV paths or globs, each optionally prefixed with its data year:
+    `2021=data/a.csv,data/b_2022.csv,2023=data/2023/*.csv`. A year prefix applies to every file its glob matches.
+    """
+    files: list[PriceFile] = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        year_str, sep, pattern = item.partition("=")
+        year: Optional[int] = None
+        if sep and year_str.strip().isdigit():
+            year, item = int(year_str), pattern.strip()
+        # An unmatched pattern is kept as-is so the loader reports it as missing
+        for path in sorted(glob.glob(item)) or [item]:
+            price_file = PriceFile(path=path, year=year if year is not None else infer_year(path))
+            if price_file not in files:
+                files.append(price_file)
+    return files
+
+
+def parse_price_row(row: dict) -> Optional[PriceRow]:
+    # Map provider fields across possible schemas
+    prov_id = first_nonempty(row, ["provider_id", "Rndrng_Prvdr_CCN"]) or ""
+    prov_name = first_nonempty(row, ["provider_name", "Rndrng_Prvdr_Org_Name"]) or ""
+    prov_city = first_nonempty(row, ["provider_city", "Rndrng_Prvdr_City"]) or ""
+    # Prefer two-letter abbreviation; do NOT use Rndrng_Prvdr_St (street address)
+    prov_state = clean_state(first_nonempty(row, ["provider_state", "Rndrng_Prvdr_State_Abrvtn"]))
+    prov_zip = (first_nonempty(row, ["provider_zip_code", "Rndrng_Prvdr_Zip5"]) or "").zfill(5)
+
+    # DRG mapping: either explicit code/desc columns or combined definition
+    if row.get("DRG_Cd") or row.get("DRG_Desc"):
+        try:
+            drg_code = int(str(row.get("DRG_Cd", "")).strip() or 0) or None
+        except Exception:
+            drg_code = None
+        drg_desc = str(row.get("DRG_Desc", "")).strip()
+    else:
+        drg_code, drg_desc = parse_drg(str(row.get("ms_drg_definition", "")))
+
+    if drg_code is None:
+        return None
+
+    discharges_str = first_nonempty(row, ["total_discharges", "Tot_Dschrgs"]) or ""
+    try:
+        discharges = int(re.sub(r"[^0-9]", "", discharges_str)) if discharges_str else None
+    except Exception:
+        discharges = None
+
+    return PriceRow(
+        prov_id=prov_id,
+        prov_name=prov_name,
+        prov_city=prov_city,
+        prov_state=prov_state,
+        prov_zip=prov_zip,
+        drg_code=drg_code,
+        drg_desc=drg_desc,
+        discharges=discharges,
+        avg_cov=clean_money(first_nonempty(row, ["average_covered_charges", "Avg_Submtd_Cvrd_Chrg"])),
+        avg_total=clean_money(first_nonempty(row, ["average_total_payments", "Avg_Tot_Pymt_Amt"])),
+        avg_medicare=clean_money(first_nonempty(row, ["average_medicare_payments", "Avg_Mdcr_Pymt_Amt"])),
+    )
+
+
+def iter_price_rows(path: str) -> Iterator[PriceRow]:
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        for row in csv.DictReader(f):
+            parsed = parse_price_row(row)
+            if parsed is not None:
+                yield parsed
+
+
+def iter_price_batches(path: str, size: int = PRICE_BATCH_SIZE) -> Iterator[list[PriceRow]]:
+    batch: list[PriceRow] = []
+    for r in iter_price_rows(path):
+        batch.append(r)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def scan_dimensions(path: str) -> tuple[dict[int, str], dict[str, dict]]:
+    """Collect the distinct DRGs and providers of one file (first occurrence wins)."""
+    drgs: dict[int, str] = {}
+    providers: dict[str, dict] = {}
+    for r in iter_price_rows(path):
+        drgs.setdefault(r.drg_code, r.drg_desc)
+        if r.prov_id not in providers:
+            providers[r.prov_id] = {
+                "provider_id": r.prov_id,
+                "provider_name": r.prov_name,
+                "provider_city": r.prov_city,
+                "provider_state": r.prov_state,
+                "provider_zip_code": r.prov_zip,
+            }
+    return drgs, providers
+
+
+async def load_zip_centroids(session: AsyncSession, path: str, profiler: Optional[EtlProfiler] = None) -> None:
     if not Path(path).exists():
         return
     with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
@@ -77,115 +226,388 @@ async def load_zip_centroids(session: AsyncSession, path: str) -> None:
                     "longitude": Decimal(r["longitude"]) if r.get("longitude") else None,
                 }
             )
-        if rows:
-            stmt = pg_insert(ZipCode).values(rows).on_conflict_do_nothing(index_elements=[ZipCode.__table__.c.zip])
+        for i in range(0, len(rows), DIMENSION_BATCH_SIZE):
+            batch = rows[i : i + DIMENSION_BATCH_SIZE]
+            stmt = pg_insert(ZipCode).values(batch).on_conflict_do_nothing(index_elements=[ZipCode.__table__.c.zip])
             await session.execute(stmt)
+        if profiler is not None:
+            profiler.count("zip_codes", len(rows))
 
 
-async def run_etl() -> None:
-    async with ASYNC_SESSION_MAKER() as session:
-        await session.run_sync(lambda s: None)
+async def upsert_dimensions(
+    session: AsyncSession, drgs: dict[int, str], providers: dict[str, dict], profiler: EtlProfiler
+) -> dict[str, int]:
+    """Insert missing DRGs/providers in key order and return the provider CCN → providers.id map."""
+    drg_rows = [{"code": code, "description": drgs[code]} for code in sorted(drgs)]
+    for i in range(0, len(drg_rows), DIMENSION_BATCH_SIZE):
+        stmt = (
+            pg_insert(DRG)
+            .values(drg_rows[i : i + DIMENSION_BATCH_SIZE])
+            .on_conflict_do_nothing(index_elements=[DRG.__table__.c.code])
+        )
+        await session.execute(stmt)
+    provider_rows = [providers[ccn] for ccn in sorted(providers)]
+    for i in range(0, len(provider_rows), DIMENSION_BATCH_SIZE):
+        stmt = (
+            pg_insert(Provider)
+            .values(provider_rows[i : i + DIMENSION_BATCH_SIZE])
+            .on_conflict_do_nothing(index_elements=[Provider.__table__.c.provider_id])
+        )
+        await session.execute(stmt)
+    profiler.count("drgs", len(drg_rows))
+    profiler.count("providers", len(provider_rows))
 
-        await load_zip_centroids(session, ZIP_CENTROIDS_PATH)
+    result = await session.execute(
+        sa.text("SELECT id, provider_id FROM providers WHERE provider_id = ANY(:ccns)"),
+        {"ccns": list(providers)},
+    )
+    return {ccn: pk for pk, ccn in result.fetchall()}
 
-        if not Path(DATA_CSV_PATH).exists():
-            await session.commit()
-            print(f"CSV not found at {DATA_CSV_PATH}; skipping prices load")
-            return
 
-        with open(DATA_CSV_PATH, newline="", encoding="utf-8-sig", errors="replace") as f:
-            reader = csv.DictReader(f)
-            drg_seen: set[int] = set()
-            provider_seen: set[str] = set()
-            for row in reader:
-                # Map provider fields across possible schemas
-                prov_id = first_nonempty(row, ["provider_id", "Rndrng_Prvdr_CCN"]) or ""
-                prov_name = first_nonempty(row, ["provider_name", "Rndrng_Prvdr_Org_Name"]) or ""
-                prov_city = first_nonempty(row, ["provider_city", "Rndrng_Prvdr_City"]) or ""
-                # Prefer two-letter abbreviation; do NOT use Rndrng_Prvdr_St (street address)
-                prov_state = clean_state(first_nonempty(row, ["provider_state", "Rndrng_Prvdr_State_Abrvtn"]))
-                prov_zip = (first_nonempty(row, ["provider_zip_code", "Rndrng_Prvdr_Zip5"]) or "").zfill(5)
-
-                # DRG mapping: either explicit code/desc columns or combined definition
-                if row.get("DRG_Cd") or row.get("DRG_Desc"):
-                    try:
-                        drg_code = int(str(row.get("DRG_Cd", "")).strip() or 0) or None
-                    except Exception:
-                        drg_code = None
-                    drg_desc = str(row.get("DRG_Desc", "")).strip()
-                else:
-                    drg_code, drg_desc = parse_drg(str(row.get("ms_drg_definition", "")))
-
-                if drg_code is None:
-                    continue
-
-                if drg_code not in drg_seen:
-                    stmt = (
-                        pg_insert(DRG)
-                        .values(code=drg_code, description=drg_desc)
-                        .on_conflict_do_nothing(index_elements=[DRG.__table__.c.code])
-                    )
-                    await session.execute(stmt)
-                    drg_seen.add(drg_code)
-
-                if prov_id not in provider_seen:
-                    stmt = (
-                        pg_insert(Provider)
-                        .values(
-                            provider_id=prov_id,
-                            provider_name=prov_name,
-                            provider_city=prov_city,
-                            provider_state=prov_state,
-                            provider_zip_code=prov_zip,
-                        )
-                        .on_conflict_do_nothing(index_elements=[Provider.__table__.c.provider_id])
-                    )
-                    await session.execute(stmt)
-                    provider_seen.add(prov_id)
-
-                avg_cov = clean_money(first_nonempty(row, ["average_covered_charges", "Avg_Submtd_Cvrd_Chrg"]))
-                avg_total = clean_money(first_nonempty(row, ["average_total_payments", "Avg_Tot_Pymt_Amt"]))
-                avg_medicare = clean_money(first_nonempty(row, ["average_medicare_payments", "Avg_Mdcr_Pymt_Amt"]))
-                discharges_str = first_nonempty(row, ["total_discharges", "Tot_Dschrgs"]) or ""
-                try:
-                    discharges = int(re.sub(r"[^0-9]", "", discharges_str)) if discharges_str else None
-                except Exception:
-                    discharges = None
-
-                await session.execute(
-                    sa.text(
-                        """
-                        INSERT INTO prices (provider_id, drg_code, total_discharges, average_covered_charges, average_total_payments, average_medicare_payments)
-                        SELECT p.id, :drg_code, :discharges, :avg_cov, :avg_total, :avg_medicare
-                        FROM providers p WHERE p.provider_id = :prov_id
-                        """
-                    ),
-                    {
-                        "prov_id": prov_id,
-                        "drg_code": drg_code,
-                        "discharges": discharges,
-                        "avg_cov": avg_cov,
-                        "avg_total": avg_total,
-                        "avg_medicare": avg_medicare,
-                    },
+# Re-loading a year updates its prices in place instead of appending duplicates
+UPSERT_PRICE_SQL = sa.text(
+    """
+    INSERT INTO prices (provider_id, drg_code, year, source_file, total_discharges, average_covered_charges, average_total_payments, average_medicare_payments)
+    VALUES (:provider_pk, :drg_code, :year, :source_file, :discharges, :avg_cov, :avg_total, :avg_medicare)
+    ON CONFLICT (provider_id, drg_code, year) DO UPDATE SET
+        source_file = EXCLUDED.source_file,
+        total_discharges = EXCLUDED.total_discharges,
+        average_covered_charges = EXCLUDED.average_covered_charges,
+        average_total_payments = EXCLUDED.average_total_payments,
+        average_medicare_payments = EXCLUDED.average_medicare_payments
+    """
+)
+
+
+# ...and rows an earlier load of the same file wrote but this one did not (e.g. dropped from a
+# corrected CMS re-release) are removed, so the file's year matches the file exactly
+DELETE_STALE_PRICES_SQL = sa.text(
+    """
+    DELETE FROM prices pr
+    WHERE pr.year = :year AND pr.source_file = :source_file
+      AND NOT EXISTS (
+          SELECT 1
+          FROM unnest(CAST(:provider_pks AS integer[]), CAST(:drg_codes AS integer[])) AS w(provider_id, drg_code)
+          WHERE w.provider_id = pr.provider_id AND w.drg_code = pr.drg_code
+      )
+    RETURNING pr.provider_id, pr.drg_code
+    """
+)
+
+
+@dataclass
+class FileLoad:
+    price_file: PriceFile
+    loaded: int = 0
+    # DRGs and providers.id of stale rows deleted; their stats and profiles need a refresh too
+    removed_drgs: set[int] = field(default_factory=set)
+    removed_providers: set[int] = field(default_factory=set)
+
+
+async def insert_price_file(
+    session: AsyncSession, price_file: PriceFile, provider_keys: dict[str, int], profiler: EtlProfiler
+) -> FileLoad:
+    """Upsert one yearly file's prices on session and drop its stale rows, without committing."""
+    source_file = Path(price_file.path).name
+    result = FileLoad(price_file)
+    written_providers: list[int] = []
+    written_drgs: list[int] = []
+    batches = iter_price_batches(price_file.path)
+    while True:
+        # CSV parsing runs in a worker thread so other files' inserts proceed meanwhile
+        rows = await asyncio.to_thread(next, batches, None)
+        if rows is None:
+            break
+        profiler.count("csv_rows", len(rows))
+        params = [
+            {
+                "provider_pk": provider_keys[r.prov_id],
+                "drg_code": r.drg_code,
+                "year": price_file.year,
+                "source_file": source_file,
+                "discharges": r.discharges,
+                "avg_cov": r.avg_cov,
+                "avg_total": r.avg_total,
+                "avg_medicare": r.avg_medicare,
+            }
+            for r in rows
+            if r.prov_id in provider_keys
+        ]
+        if not params:
+            continue
+        with profiler.stage("price_insert"):
+            await session.execute(UPSERT_PRICE_SQL, params)
+        result.loaded += len(params)
+        written_providers.extend(p["provider_pk"] for p in params)
+        written_drgs.extend(p["drg_code"] for p in params)
+
+    with profiler.stage("stale_price_delete"):
+        removed = await session.execute(
+            DELETE_STALE_PRICES_SQL,
+            {
+                "year": price_file.year,
+                "source_file": source_file,
+                "provider_pks": written_providers,
+                "drg_codes": written_drgs,
+            },
+        )
+        removed_rows = 0
+        for r in removed:
+            removed_rows += 1
+            result.removed_providers.add(r.provider_id)
+            result.removed_drgs.add(r.drg_code)
+    profiler.count("prices", result.loaded)
+    print(f"Loaded {result.loaded} prices for {price_file.year} from {price_file.path} ({removed_rows} stale removed)")
+    return result
+
+
+async def load_price_file(
+    price_file: PriceFile, provider_keys: dict[str, int], profiler: EtlProfiler, limit: asyncio.Semaphore
+) -> FileLoad:
+    """Load one file on its own connection and transaction, once a connection slot is free."""
+    async with limit:
+        async with get_session_maker()() as session:
+            result = await insert_price_file(session, price_file, provider_keys, profiler)
+            with profiler.stage("commit"):
+                await session.commit()
+    return result
+
+
+async def load_prices(
+    price_files: list[PriceFile],
+    provider_keys: dict[str, int],
+    profiler: EtlProfiler,
+    connections: int = ETL_DB_CONNECTIONS,
+) -> tuple[list[FileLoad], list[tuple[PriceFile, BaseException]]]:
+    """Load files concurrently, one transaction each; returns the committed loads and the failures."""
+    limit = asyncio.Semaphore(max(1, connections))
+    results = await asyncio.gather(
+        *(load_price_file(f, provider_keys, profiler, limit) for f in price_files), return_exceptions=True
+    )
+    loads = [r for r in results if isinstance(r, FileLoad)]
+    failures = [(f, r) for f, r in zip(price_files, results) if isinstance(r, BaseException)]
+    return loads, failures
+
+
+def _stat_columns(column: str, prefix: str) -> str:
+    return f"""
+        MIN(pr.{column}) AS {prefix}_min,
+        percentile_cont(0.1) WITHIN GROUP (ORDER BY pr.{column}) AS {prefix}_p10,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY pr.{column}) AS {prefix}_median,
+        percentile_cont(0.9) WITHIN GROUP (ORDER BY pr.{column}) AS {prefix}_p90,
+        AVG(pr.{column}) AS {prefix}_mean"""
+
+
+async def refresh_price_stats(session: AsyncSession, drg_codes: list[int], years: list[int]) -> set[int]:
+    """
+    Rebuild drg_price_stats and prices.charges_percentile for the DRGs/years just loaded.
+    Everything else is left untouched, so the cost scales with the load, not the table.
+    Returns the providers.id of every price whose percentile changed, including providers
+    from earlier loads, so their profiles can be rebuilt too.
+    """
+    params = {"drg_codes": drg_codes, "years": years}
+    await session.execute(
+        sa.text("DELETE FROM drg_price_stats WHERE drg_code = ANY(:drg_codes) AND year = ANY(:years)"),
+        params,
+    )
+    await session.execute(
+        sa.text(
+            f"""
+            INSERT INTO drg_price_stats (
+                drg_code, year, scope, scope_value, provider_count,
+                covered_charges_min, covered_charges_p10, covered_charges_median, covered_charges_p90, covered_charges_mean,
+                total_payments_min, total_payments_p10, total_payments_median, total_payments_p90, total_payments_mean
+            )
+            SELECT
+                pr.drg_code,
+                pr.year,
+                CASE
+                    WHEN GROUPING(p.provider_state) = 0 THEN 'state'
+                    WHEN GROUPING(r.region_name) = 0 THEN 'region'
+                    ELSE 'national'
+                END AS scope,
+                CASE
+                    WHEN GROUPING(p.provider_state) = 0 THEN p.provider_state
+                    WHEN GROUPING(r.region_name) = 0 THEN r.region_name
+                    ELSE 'US'
+                END AS scope_value,
+                COUNT(*) AS provider_count,
+                {_stat_columns("average_covered_charges", "covered_charges")},
+                {_stat_columns("average_total_payments", "total_payments")}
+            FROM prices pr
+            JOIN providers p ON p.id = pr.provider_id
+            LEFT JOIN state_regions sr ON sr.state = p.provider_state
+            CROSS JOIN LATERAL (SELECT COALESCE(sr.region, 'Other') AS region_name) r
+            WHERE pr.drg_code = ANY(:drg_codes) AND pr.year = ANY(:years)
+            GROUP BY GROUPING SETS (
+                (pr.drg_code, pr.year),
+                (pr.drg_code, pr.year, r.region_name),
+                (pr.drg_code, pr.year, p.provider_state)
+            )
+            """
+        ),
+        params,
+    )
+    # Prices without covered charges stay NULL so they do not skew everyone else's rank
+    reranked = await session.execute(
+        sa.text(
+            """
+            UPDATE prices pr
+            SET charges_percentile = ranked.pct
+            FROM (
+                SELECT id, drg_code,
+                       round(CAST(percent_rank() OVER (PARTITION BY drg_code, year ORDER BY average_covered_charges) * 100 AS numeric), 2) AS pct
+                FROM prices
+                WHERE drg_code = ANY(:drg_codes) AND year = ANY(:years) AND average_covered_charges IS NOT NULL
+            ) ranked
+            WHERE pr.id = ranked.id AND pr.drg_code = ranked.drg_code
+              AND pr.charges_percentile IS DISTINCT FROM ranked.pct
+            RETURNING pr.provider_id
+            """
+        ),
+        params,
+    )
+    # ...including rows reloaded without covered charges that were ranked by an earlier load
+    cleared = await session.execute(
+        sa.text(
+            """
+            UPDATE prices
+            SET charges_percentile = NULL
+            WHERE drg_code = ANY(:drg_codes) AND year = ANY(:years)
+              AND average_covered_charges IS NULL AND charges_percentile IS NOT NULL
+            RETURNING provider_id
+            """
+        ),
+        params,
+    )
+    return {r.provider_id for r in reranked} | {r.provider_id for r in cleared}
+
+
+# Providers per profile rebuild statement; large providers carry hundreds of DRG entries each
+PROFILE_BATCH_SIZE = 500
+
+PROFILE_SQL = sa.text(
+    """
+    INSERT INTO provider_profiles (provider_id, profile, drg_count, refreshed_at)
+    SELECT
+        p.provider_id,
+        jsonb_build_object(
+            'provider_id', p.provider_id,
+            'provider_name', p.provider_name,
+            'provider_city', p.provider_city,
+            'provider_state', p.provider_state,
+            'provider_zip_code', p.provider_zip_code,
+            'latitude', p.latitude,
+            'longitude', p.longitude,
+            'avg_rating', rt.avg_rating,
+            'rating_count', rt.rating_count,
+            'drg_count', COALESCE(px.drg_count, 0),
+            'refreshed_at', stamp.ts,
+            'drgs', COALESCE(px.drgs, '[]'::jsonb)
+        ),
+        COALESCE(px.drg_count, 0),
+        stamp.ts
+    FROM providers p
+    CROSS JOIN (SELECT LOCALTIMESTAMP AS ts) stamp
+    CROSS JOIN LATERAL (
+        SELECT AVG(sr.rating) AS avg_rating, COUNT(*) AS rating_count
+        FROM star_ratings sr WHERE sr.provider_id = p.id
+    ) rt
+    LEFT JOIN LATERAL (
+        SELECT
+            COUNT(*) AS drg_count,
+            jsonb_agg(
+                jsonb_build_object(
+                    'drg_code', latest.drg_code,
+                    'drg_description', d.description,
+                    'year', latest.year,
+                    'total_discharges', latest.total_discharges,
+                    'average_covered_charges', latest.average_covered_charges,
+                    'average_total_payments', latest.average_total_payments,
+                    'average_medicare_payments', latest.average_medicare_payments,
+                    'charges_percentile', latest.charges_percentile
                 )
+                ORDER BY latest.drg_code
+            ) AS drgs
+        FROM (
+            -- Latest loaded year of each DRG this provider bills
+            SELECT DISTINCT ON (pr.drg_code) pr.*
+            FROM prices pr
+            WHERE pr.provider_id = p.id
+            ORDER BY pr.drg_code, pr.year DESC
+        ) latest
+        JOIN drgs d ON d.code = latest.drg_code
+    ) px ON TRUE
+    WHERE p.id = ANY(:provider_pks)
+    ON CONFLICT (provider_id) DO UPDATE SET
+        profile = EXCLUDED.profile,
+        drg_count = EXCLUDED.drg_count,
+        refreshed_at = EXCLUDED.refreshed_at
+    """
+)
+
 
-        # Populate provider lat/lon from ZIP centroids
-        await session.execute(
+async def refresh_provider_profiles(session: AsyncSession, provider_pks: list[int], profiler: EtlProfiler) -> None:
+    """Rebuild the provider_profiles documents of the given providers.id (after prices, percentiles and ratings)."""
+    pks = sorted(provider_pks)
+    for i in range(0, len(pks), PROFILE_BATCH_SIZE):
+        await session.execute(PROFILE_SQL, {"provider_pks": pks[i : i + PROFILE_BATCH_SIZE]})
+    profiler.count("provider_profiles", len(pks))
+
+
+async def upsert_file_dimensions(
+    session: AsyncSession, price_files: list[PriceFile], profiler: EtlProfiler
+) -> tuple[dict[int, str], dict[str, int]]:
+    """
+    Dimensions from every file are deduplicated and written once, in key order, before the
+    per-file loaders start; concurrent upserts of shared providers could deadlock.
+    Returns the DRGs seen and the provider CCN → providers.id map.
+    """
+    with profiler.stage("scan"):
+        scans = await asyncio.gather(*(asyncio.to_thread(scan_dimensions, f.path) for f in price_files))
+    drgs: dict[int, str] = {}
+    providers: dict[str, dict] = {}
+    for file_drgs, file_providers in scans:
+        for code, desc in file_drgs.items():
+            drgs.setdefault(code, desc)
+        for ccn, record in file_providers.items():
+            providers.setdefault(ccn, record)
+
+    with profiler.stage("drg_provider_upsert"):
+        provider_keys = await upsert_dimensions(session, drgs, providers, profiler)
+    return drgs, provider_keys
+
+
+async def finish_load(
+    session: AsyncSession, drgs: dict[int, str], loads: list[FileLoad], provider_keys: dict[str, int], profiler: EtlProfiler
+) -> None:
+    """Geocode providers and refresh stats, percentiles, ratings and profiles for the loaded files."""
+    # Populate provider lat/lon from ZIP centroids
+    with profiler.stage("geocode_update"):
+        geocoded = await session.execute(
             sa.text(
                 """
                 UPDATE providers p
                 SET latitude = z.latitude, longitude = z.longitude
                 FROM zip_codes z
                 WHERE p.provider_zip_code = z.zip AND (p.latitude IS NULL OR p.longitude IS NULL)
+                RETURNING p.id
                 """
             )
         )
+        # Older providers whose ZIP only arrived with this load also need new profiles
+        changed_providers = {r.id for r in geocoded}
+
+    refresh_drgs = set(drgs).union(*(load.removed_drgs for load in loads))
+    years = sorted({load.price_file.year for load in loads})
+    with profiler.stage("stats_refresh"):
+        changed_providers |= await refresh_price_stats(session, sorted(refresh_drgs), years)
 
-        # Generate mock ratings (deterministic per provider_id)
+    # Generate mock ratings (deterministic per provider_id)
+    with profiler.stage("ratings"):
         result = await session.execute(sa.text("SELECT id, provider_id FROM providers"))
-        providers = result.fetchall()
-        for pid, prov_ccn in providers:
+        providers_rows = result.fetchall()
+        for pid, prov_ccn in providers_rows:
             random.seed(prov_ccn)
             rating = random.randint(6, 10)
             # Insert only if not exists, no unique constraint required
@@ -202,11 +624,130 @@ async def run_etl() -> None:
                 {"pid": pid, "rating": rating},
             )
 
-        await session.commit()
-        print("ETL completed.")
+    with profiler.stage("profiles_refresh"):
+        # Loaded providers, plus earlier ones whose coordinates, percentiles or stale prices just changed
+        changed_providers = changed_providers.union(*(load.removed_providers for load in loads))
+        await refresh_provider_profiles(session, list(changed_providers | set(provider_keys.values())), profiler)
 
 
-if __name__ == "__main__":
-    asyncio.run(run_etl())
+async def run_etl(
+    profiler: Optional[EtlProfiler] = None,
+    price_files: Optional[list[PriceFile]] = None,
+    connections: int = ETL_DB_CONNECTIONS,
+    commit_mode: str = ETL_COMMIT,
+) -> None:
+    if commit_mode not in COMMIT_MODES:
+        raise ValueError(f"ETL_COMMIT must be one of {', '.join(COMMIT_MODES)}, got {commit_mode!r}")
+    profiler = profiler or EtlProfiler()
+    price_files = price_files if price_files is not None else parse_price_files(DATA_CSV_PATH)
+
+    present = []
+    for price_file in price_files:
+        if Path(price_file.path).exists():
+            present.append(price_file)
+        else:
+            print(f"CSV not found at {price_file.path}; skipping prices load")
+
+    failures: list[tuple[PriceFile, BaseException]] = []
+    if commit_mode == "single":
+        # Everything on one connection and one transaction: a failure anywhere leaves the database as it was
+        async with get_session_maker()() as session:
+            with profiler.stage("zip_load"):
+                await load_zip_centroids(session, ZIP_CENTROIDS_PATH, profiler)
+            if present:
+                drgs, provider_keys = await upsert_file_dimensions(session, present, profiler)
+                loads = [await insert_price_file(session, f, provider_keys, profiler) for f in present]
+                await finish_load(session, drgs, loads, provider_keys, profiler)
+            with profiler.stage("commit"):
+                await session.commit()
+    else:
+        async with get_session_maker()() as session:
+            with profiler.stage("zip_load"):
+                await load_zip_centroids(session, ZIP_CENTROIDS_PATH, profiler)
+            if present:
+                drgs, provider_keys = await upsert_file_dimensions(session, present, profiler)
+            with profiler.stage("commit"):
+                await session.commit()
+        if not present:
+            return
+
+        loads, failures = await load_prices(present, provider_keys, profiler, connections)
+        # Files that committed still get their stats, percentiles and profiles before a failure is raised
+        async with get_session_maker()() as session:
+            await finish_load(session, drgs, loads, provider_keys, profiler)
+            with profiler.stage("commit"):
+                await session.commit()
 
+    if not present:
+        return
+
+    # Publish the committed data to API workers
+    if SNAPSHOT_PATH:
+        async with get_session_maker()() as session:
+            with profiler.stage("snapshot"):
+                await write_snapshot(session, SNAPSHOT_PATH)
+
+    if failures:
+        for price_file, exc in failures:
+            print(f"Failed to load {price_file.path}: {type(exc).__name__}: {exc}")
+        raise failures[0][1]
+    print("ETL completed.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load CMS inpatient prices, ZIP centroids and mock ratings")
+    parser.add_argument(
+        "--csv",
+        action="append",
+        help="Price CSV or glob, optionally YEAR=PATH; repeat for several files (default: CMS_CSV env)",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=ETL_DB_CONNECTIONS,
+        help="Files loaded concurrently, one DB connection each (default: ETL_DB_CONNECTIONS env or 4)",
+    )
+    parser.add_argument(
+        "--commit",
+        choices=COMMIT_MODES,
+        default=ETL_COMMIT,
+        help="per-file: one transaction per file; single: the whole run in one transaction (default: ETL_COMMIT env)",
+    )
+    parser.add_argument("--profile", action="store_true", help="Report per-stage timings, rows/s, round trips and peak RSS")
+    parser.add_argument("--profile-json", help="Also write the profile report as JSON to this path (implies --profile)")
+    parser.add_argument("--cprofile", help="Write cProfile stats to this path (inspect with snakeviz or pstats)")
+    args = parser.parse_args()
+
+    profiler: Optional[EtlProfiler] = None
+    if args.profile or args.profile_json:
+        profiler = EtlProfiler()
+        profiler.attach(get_engine())
 
+    price_files = parse_price_files(",".join(args.csv) if args.csv else DATA_CSV_PATH)
+    cprof = cProfile.Profile() if args.cprofile else None
+    if cprof is not None:
+        cprof.enable()
+    try:
+        asyncio.run(run_etl(profiler, price_files, args.connections, args.commit))
+    finally:
+        if cprof is not None:
+            cprof.disable()
+            cprof.dump_stats(args.cprofile)
+            print(f"cProfile stats written to {args.cprofile}")
+
+    if profiler is not None:
+        profiler.finish()
+        profiler.detach()
+        profiler.print_report()
+        if args.profile_json:
+            report = {
+                "csv": [f.path for f in price_files],
+                "years": sorted({f.year for f in price_files}),
+                "zip_csv": ZIP_CENTROIDS_PATH,
+                **profiler.report(),
+            }
+            Path(args.profile_json).write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import resource
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# Per-task current stage, so concurrent file loaders attribute round trips to their own stage
+_CURRENT_STAGE: ContextVar[Optional[str]] = ContextVar("etl_stage", default=None)
+
+
+class EtlProfiler:
+    """
+    Accumulates per-stage wall time, row counts and DB round trips for one ETL run.
+    Stages may be entered many times (e.g. once per batch); their durations add up, and
+    stages run by concurrent tasks add up too, so they can exceed total wall time.
+    """
+
+    def __init__(self) -> None:
+        self.stage_seconds: dict[str, float] = defaultdict(float)
+        self.stage_round_trips: dict[str, int] = defaultdict(int)
+        self.rows: dict[str, int] = defaultdict(int)
+        self.round_trips = 0
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._engine: Optional[AsyncEngine] = None
+
+    def attach(self, engine: AsyncEngine) -> None:
+        # One cursor execute (or executemany) is one client/server round trip
+        self._engine = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def detach(self) -> None:
+        if self._engine is not None:
+            event.remove(self._engine.sync_engine, "before_cursor_execute", self._on_execute)
+            self._engine = None
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.round_trips += 1
+        self.stage_round_trips[_CURRENT_STAGE.get() or "other"] += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        token = _CURRENT_STAGE.set(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - started
+            _CURRENT_STAGE.reset(token)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.rows[name] += n
+
+    def finish(self) -> None:
+        self._finished = time.perf_counter()
+
+    @staticmethod
+    def peak_rss_mb() -> float:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    def report(self) -> dict[str, Any]:
+        total = (self._finished or time.perf_counter()) - self._started
+        price_rows = self.rows.get("prices", 0)
+        return {
+            "total_seconds": round(total, 3),
+            "rows": dict(self.rows),
+            "rows_per_second": round(price_rows / total, 1) if total else 0.0,
+            "round_trips": self.round_trips,
+            "peak_rss_mb": round(self.peak_rss_mb(), 1),
+            "stages": {
+                name: {
+                    "seconds": round(seconds, 3),
+                    "round_trips": self.stage_round_trips.get(name, 0),
+                }
+                for name, seconds in self.stage_seconds.items()
+            },
+        }
+
+    def print_report(self) -> None:
+        data = self.report()
+        print(f"ETL profile: {data['total_seconds']:.2f}s total, {data['rows_per_second']:.0f} price rows/s, "
+              f"{data['round_trips']} DB round trips, peak RSS {data['peak_rss_mb']:.1f} MiB")
+        for name, stage in data["stages"].items():
+            print(f"  {name:<22} {stage['seconds']:>9.3f}s  {stage['round_trips']:>9} round trips")
+        for name, n in data["rows"].items():
+            print(f"  rows.{name:<17} {n:>10}")
@@ -0,0 +1,107 @@
+"""
+Build the memory-mapped reference snapshot served by app/services/snapshot.py.
+
+    SNAPSHOT_PATH=data/snapshot.bin python -m etl.snapshot
+
+The ETL calls write_snapshot() at the end of a load when SNAPSHOT_PATH is set. The file is
+written next to the target and atomically renamed over it, so running API workers switch
+to the new generation on their next check without ever seeing a partial file.
+"""
+
+import asyncio
+import os
+import time
+from array import array
+from pathlib import Path
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_session_maker
+from app.services.snapshot import (
+    ALIGNMENT,
+    HEADER,
+    MAGIC,
+    SECTION_ENTRY,
+    SECTIONS,
+    VERSION,
+    Snapshot,
+    header_size,
+)
+
+
+NAN = float("nan")
+
+
+def _float(value) -> float:
+    return float(value) if value is not None else NAN
+
+
+def _previous_generation(path: str) -> int:
+    try:
+        return Snapshot(path).generation
+    except (OSError, ValueError):
+        return 0
+
+
+async def build_sections(session: AsyncSession) -> dict[str, array]:
+    sections = {name: array(typecode) for name, typecode in SECTIONS}
+    zips = (
+        await session.execute(
+            sa.text("SELECT zip, latitude, longitude FROM zip_codes WHERE zip ~ '^[0-9]{5}$' ORDER BY zip")
+        )
+    ).fetchall()
+    for r in zips:
+        sections["zip_code"].append(int(r.zip))
+        sections["zip_lat"].append(_float(r.latitude))
+        sections["zip_lon"].append(_float(r.longitude))
+    return sections
+
+
+def write_snapshot_file(path: str, sections: dict[str, array], generation: int) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+
+    entries: list[tuple[int, int]] = []
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * header_size())
+        for name, _ in SECTIONS:
+            pad = -f.tell() % ALIGNMENT
+            f.write(b"\0" * pad)
+            data = sections[name].tobytes()
+            entries.append((f.tell(), len(data)))
+            f.write(data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, generation, time.time()))
+        for offset, nbytes in entries:
+            f.write(SECTION_ENTRY.pack(offset, nbytes))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp, target)
+    # Persist the rename itself
+    dir_fd = os.open(target.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+async def write_snapshot(session: AsyncSession, path: str) -> int:
+    """Write a new snapshot generation to path and return its generation number."""
+    sections = await build_sections(session)
+    generation = _previous_generation(path) + 1
+    write_snapshot_file(path, sections, generation)
+    print(f"Snapshot generation {generation} written to {path}: {len(sections['zip_code'])} ZIPs")
+    return generation
+
+
+async def main() -> None:
+    path = os.getenv("SNAPSHOT_PATH", "data/snapshot.bin")
+    async with get_session_maker()() as session:
+        await write_snapshot(session, path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
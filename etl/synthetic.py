@@ -0,0 +1,357 @@
+"""
+Deterministic synthetic CMS inpatient dataset generator.
+
+Writes a prices CSV in either the current CMS layout (Rndrng_Prvdr_*, DRG_Cd, ...) or the
+legacy layout (provider_id, ms_drg_definition, ...) accepted by etl/etl.py, plus a matching
+ZIP centroid CSV. The same arguments and seed always produce byte-identical files, so the
+output can back ETL and query benchmarks across commits.
+
+Example (roughly national scale, ~3.2M rows):
+    python etl/synthetic.py --providers 3200 --drgs 750 --rows 3200000 --states 51 --zips 30000
+"""
+
+import argparse
+import csv
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+
+CMS_COLUMNS = [
+    "Rndrng_Prvdr_CCN",
+    "Rndrng_Prvdr_Org_Name",
+    "Rndrng_Prvdr_City",
+    "Rndrng_Prvdr_St",
+    "Rndrng_Prvdr_State_FIPS",
+    "Rndrng_Prvdr_Zip5",
+    "Rndrng_Prvdr_State_Abrvtn",
+    "Rndrng_Prvdr_RUCA",
+    "Rndrng_Prvdr_RUCA_Desc",
+    "DRG_Cd",
+    "DRG_Desc",
+    "Tot_Dschrgs",
+    "Avg_Submtd_Cvrd_Chrg",
+    "Avg_Tot_Pymt_Amt",
+    "Avg_Mdcr_Pymt_Amt",
+]
+
+LEGACY_COLUMNS = [
+    "ms_drg_definition",
+    "provider_id",
+    "provider_name",
+    "provider_street_address",
+    "provider_city",
+    "provider_state",
+    "provider_zip_code",
+    "total_discharges",
+    "average_covered_charges",
+    "average_total_payments",
+    "average_medicare_payments",
+]
+
+# (abbreviation, FIPS, anchor city, latitude, longitude). NY comes first so the
+# README examples (10001, 10032, ...) resolve to Manhattan-area centroids.
+STATES = [
+    ("NY", "36", "New York", 40.7506, -73.9970),
+    ("CA", "06", "Los Angeles", 34.0522, -118.2437),
+    ("TX", "48", "Houston", 29.7604, -95.3698),
+    ("FL", "12", "Miami", 25.7617, -80.1918),
+    ("IL", "17", "Chicago", 41.8781, -87.6298),
+    ("PA", "42", "Philadelphia", 39.9526, -75.1652),
+    ("OH", "39", "Columbus", 39.9612, -82.9988),
+    ("GA", "13", "Atlanta", 33.7490, -84.3880),
+    ("NC", "37", "Charlotte", 35.2271, -80.8431),
+    ("MI", "26", "Detroit", 42.3314, -83.0458),
+    ("NJ", "34", "Newark", 40.7357, -74.1724),
+    ("VA", "51", "Richmond", 37.5407, -77.4360),
+    ("WA", "53", "Seattle", 47.6062, -122.3321),
+    ("AZ", "04", "Phoenix", 33.4484, -112.0740),
+    ("MA", "25", "Boston", 42.3601, -71.0589),
+    ("TN", "47", "Nashville", 36.1627, -86.7816),
+    ("IN", "18", "Indianapolis", 39.7684, -86.1581),
+    ("MO", "29", "Saint Louis", 38.6270, -90.1994),
+    ("MD", "24", "Baltimore", 39.2904, -76.6122),
+    ("WI", "55", "Milwaukee", 43.0389, -87.9065),
+    ("CO", "08", "Denver", 39.7392, -104.9903),
+    ("MN", "27", "Minneapolis", 44.9778, -93.2650),
+    ("SC", "45", "Columbia", 34.0007, -81.0348),
+    ("AL", "01", "Birmingham", 33.5186, -86.8104),
+    ("LA", "22", "New Orleans", 29.9511, -90.0715),
+    ("KY", "21", "Louisville", 38.2527, -85.7585),
+    ("OR", "41", "Portland", 45.5152, -122.6784),
+    ("OK", "40", "Oklahoma City", 35.4676, -97.5164),
+    ("CT", "09", "Hartford", 41.7658, -72.6734),
+    ("UT", "49", "Salt Lake City", 40.7608, -111.8910),
+    ("IA", "19", "Des Moines", 41.5868, -93.6250),
+    ("NV", "32", "Las Vegas", 36.1699, -115.1398),
+    ("AR", "05", "Little Rock", 34.7465, -92.2896),
+    ("MS", "28", "Jackson", 32.2988, -90.1848),
+    ("KS", "20", "Wichita", 37.6872, -97.3301),
+    ("NM", "35", "Albuquerque", 35.0844, -106.6504),
+    ("NE", "31", "Omaha", 41.2565, -95.9345),
+    ("ID", "16", "Boise", 43.6150, -116.2023),
+    ("WV", "54", "Charleston", 38.3498, -81.6326),
+    ("HI", "15", "Honolulu", 21.3069, -157.8583),
+    ("NH", "33", "Manchester", 42.9956, -71.4548),
+    ("ME", "23", "Portland", 43.6591, -70.2568),
+    ("MT", "30", "Billings", 45.7833, -108.5007),
+    ("RI", "44", "Providence", 41.8240, -71.4128),
+    ("DE", "10", "Wilmington", 39.7391, -75.5398),
+    ("SD", "46", "Sioux Falls", 43.5446, -96.7311),
+    ("ND", "38", "Fargo", 46.8772, -96.7898),
+    ("AK", "02", "Anchorage", 61.2181, -149.9003),
+    ("DC", "11", "Washington", 38.9072, -77.0369),
+    ("VT", "50", "Burlington", 44.4759, -73.2121),
+    ("WY", "56", "Cheyenne", 41.1400, -104.8202),
+]
+
+# A handful of real MS-DRGs so text searches like "knee joint replacement" behave as in production
+KNOWN_DRGS = {
+    470: "MAJOR HIP AND KNEE JOINT REPLACEMENT OR REATTACHMENT OF LOWER EXTREMITY WITHOUT MCC",
+    469: "MAJOR HIP AND KNEE JOINT REPLACEMENT OR REATTACHMENT OF LOWER EXTREMITY WITH MCC",
+    291: "HEART FAILURE AND SHOCK WITH MCC",
+    292: "HEART FAILURE AND SHOCK WITH CC",
+    460: "SPINAL FUSION EXCEPT CERVICAL WITHOUT MCC",
+    871: "SEPTICEMIA OR SEVERE SEPSIS WITHOUT MV >96 HOURS WITH MCC",
+    872: "SEPTICEMIA OR SEVERE SEPSIS WITHOUT MV >96 HOURS WITHOUT MCC",
+    190: "CHRONIC OBSTRUCTIVE PULMONARY DISEASE WITH MCC",
+    247: "PERCUTANEOUS CARDIOVASCULAR PROCEDURES WITH DRUG-ELUTING STENT WITHOUT MCC",
+    233: "CORONARY BYPASS WITH CARDIAC CATHETERIZATION WITH MCC",
+    65: "INTRACRANIAL HEMORRHAGE OR CEREBRAL INFARCTION WITH CC OR TPA IN 24 HRS",
+    683: "RENAL FAILURE WITH CC",
+    392: "ESOPHAGITIS, GASTROENTERITIS AND MISCELLANEOUS DIGESTIVE DISORDERS WITHOUT MCC",
+    603: "CELLULITIS WITHOUT MCC",
+    194: "SIMPLE PNEUMONIA AND PLEURISY WITH CC",
+}
+
+BODY_SYSTEMS = [
+    "NERVOUS SYSTEM", "EYE", "EAR, NOSE, MOUTH AND THROAT", "RESPIRATORY SYSTEM", "CIRCULATORY SYSTEM",
+    "DIGESTIVE SYSTEM", "HEPATOBILIARY SYSTEM", "MUSCULOSKELETAL SYSTEM", "SKIN AND BREAST",
+    "ENDOCRINE SYSTEM", "KIDNEY AND URINARY TRACT", "REPRODUCTIVE SYSTEM", "BLOOD AND IMMUNOLOGY",
+]
+PROCEDURES = ["PROCEDURES", "DISORDERS", "INJURIES", "MALIGNANCY", "INFECTIONS", "OTHER DIAGNOSES"]
+SEVERITIES = ["WITH MCC", "WITH CC", "WITHOUT CC/MCC", "WITHOUT MCC"]
+
+NAME_PREFIXES = ["St. Mary", "Mercy", "Good Samaritan", "Memorial", "Regional", "University", "Community",
+                 "Providence", "Baptist", "Methodist", "Presbyterian", "Sacred Heart", "Riverside", "Valley"]
+NAME_SUFFIXES = ["Hospital", "Medical Center", "Health System", "General Hospital", "Regional Medical Center"]
+STREETS = ["Main St", "Hospital Dr", "Medical Center Blvd", "Park Ave", "Oak St", "Broadway", "Health Way"]
+RUCA = [("1", "Metropolitan area core: primary flow within an urbanized area of 50,000 and greater"),
+        ("4", "Micropolitan area core: primary flow within an Urban Cluster of 10,000 to 49,999"),
+        ("10", "Rural areas: primary flow to a tract outside a UA or UC")]
+
+KM_PER_DEGREE = 111.0
+
+
+@dataclass(frozen=True)
+class ZipCentroid:
+    zip: str
+    city: str
+    state: str
+    fips: str
+    latitude: float
+    longitude: float
+
+
+@dataclass(frozen=True)
+class SyntheticProvider:
+    ccn: str
+    name: str
+    street: str
+    centroid: ZipCentroid
+    ruca: tuple[str, str]
+    # Multiplier applied to every DRG price, so some hospitals are consistently pricier
+    price_factor: float
+
+
+@dataclass(frozen=True)
+class SyntheticDRG:
+    code: int
+    description: str
+    base_payment: float
+    # Relative share of providers billing this DRG
+    popularity: float
+
+
+def build_zip_centroids(rng: random.Random, zips: int, states: int, spread_km: float) -> list[ZipCentroid]:
+    chosen = STATES[: max(1, min(states, len(STATES)))]
+    per_state, extra = divmod(zips, len(chosen))
+    out: list[ZipCentroid] = []
+    next_zip = 10001
+    for i, (abbr, fips, city, lat, lon) in enumerate(chosen):
+        count = per_state + (1 if i < extra else 0)
+        for j in range(count):
+            # First centroid sits on the anchor; the rest scatter around it
+            if j == 0:
+                dlat = dlon = 0.0
+            else:
+                dlat = rng.gauss(0.0, spread_km / KM_PER_DEGREE)
+                dlon = rng.gauss(0.0, spread_km / KM_PER_DEGREE)
+            out.append(ZipCentroid(f"{next_zip:05d}", city, abbr, fips, round(lat + dlat, 4), round(lon + dlon, 4)))
+            next_zip += 1
+    return out
+
+
+def build_drgs(rng: random.Random, count: int) -> list[SyntheticDRG]:
+    codes = sorted(KNOWN_DRGS)[:count]
+    candidate = 1
+    while len(codes) < count:
+        if candidate not in KNOWN_DRGS:
+            codes.append(candidate)
+        candidate += 1
+    out: list[SyntheticDRG] = []
+    for rank, code in enumerate(sorted(codes, key=lambda c: (c not in KNOWN_DRGS, c))):
+        desc = KNOWN_DRGS.get(code) or (
+            f"{rng.choice(BODY_SYSTEMS)} {rng.choice(PROCEDURES)} {rng.choice(SEVERITIES)}"
+        )
+        # Zipf-like skew: a few DRGs are billed almost everywhere, the long tail rarely
+        out.append(SyntheticDRG(code, desc, round(rng.uniform(4_000, 60_000), 2), 1.0 / (rank + 1) ** 0.6))
+    return sorted(out, key=lambda d: d.code)
+
+
+def build_providers(rng: random.Random, count: int, centroids: list[ZipCentroid]) -> list[SyntheticProvider]:
+    out: list[SyntheticProvider] = []
+    for i in range(count):
+        centroid = centroids[i % len(centroids)] if i < len(centroids) else rng.choice(centroids)
+        fips = int(centroid.fips)
+        name = f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_SUFFIXES)} of {centroid.city} #{i + 1}"
+        out.append(
+            SyntheticProvider(
+                ccn=f"{fips:02d}{i:04d}" if i < 10_000 else f"{fips:02d}{i:06d}",
+                name=name.upper(),
+                street=f"{rng.randint(1, 9999)} {rng.choice(STREETS)}".upper(),
+                centroid=centroid,
+                ruca=rng.choice(RUCA),
+                price_factor=rng.lognormvariate(0.0, 0.35),
+            )
+        )
+    return out
+
+
+def iter_price_rows(
+    rng: random.Random, providers: list[SyntheticProvider], drgs: list[SyntheticDRG], rows: int
+) -> Iterator[tuple[SyntheticProvider, SyntheticDRG, int, float, float, float]]:
+    """Yield (provider, drg, discharges, covered, total, medicare) with at most one row per provider/DRG pair."""
+    target_per_provider = min(len(drgs), max(1.0, rows / max(1, len(providers))))
+    # Solve for the scale where the clamped inclusion probabilities add up to the target
+    lo, hi = 0.0, target_per_provider / min(d.popularity for d in drgs)
+    for _ in range(50):
+        mid = (lo + hi) / 2
+        if sum(min(1.0, d.popularity * mid) for d in drgs) < target_per_provider:
+            lo = mid
+        else:
+            hi = mid
+    probs = [min(1.0, d.popularity * hi) for d in drgs]
+    emitted = 0
+    for provider in providers:
+        for drg, p in zip(drgs, probs):
+            if emitted >= rows:
+                return
+            if rng.random() >= p:
+                continue
+            total = drg.base_payment * provider.price_factor * rng.uniform(0.85, 1.15)
+            medicare = total * rng.uniform(0.75, 0.92)
+            covered = total * rng.uniform(2.5, 6.0)
+            yield provider, drg, rng.randint(11, 400), covered, total, medicare
+            emitted += 1
+
+
+def _money(value: float, legacy: bool) -> str:
+    return f"${value:,.2f}" if legacy else f"{value:.2f}"
+
+
+def write_zip_csv(path: Path, centroids: list[ZipCentroid]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["zip", "city", "state", "latitude", "longitude"])
+        for c in centroids:
+            writer.writerow([c.zip, c.city, c.state, f"{c.latitude:.4f}", f"{c.longitude:.4f}"])
+
+
+def write_prices_csv(path: Path, layout: str, rows: Iterator[tuple]) -> int:
+    legacy = layout == "legacy"
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(LEGACY_COLUMNS if legacy else CMS_COLUMNS)
+        for provider, drg, discharges, covered, total, medicare in rows:
+            c = provider.centroid
+            if legacy:
+                writer.writerow([
+                    f"{drg.code:03d} - {drg.description}", provider.ccn, provider.name, provider.street,
+                    c.city.upper(), c.state, c.zip, discharges,
+                    _money(covered, True), _money(total, True), _money(medicare, True),
+                ])
+            else:
+                writer.writerow([
+                    provider.ccn, provider.name, c.city, provider.street, c.fips, c.zip, c.state,
+                    provider.ruca[0], provider.ruca[1], f"{drg.code:03d}", drg.description, discharges,
+                    _money(covered, False), _money(total, False), _money(medicare, False),
+                ])
+            written += 1
+    return written
+
+
+def generate(
+    out_dir: Path,
+    providers: int,
+    drgs: int,
+    rows: int,
+    zips: int,
+    states: int,
+    spread_km: float,
+    layout: str,
+    seed: int,
+    prefix: str = "synthetic",
+) -> tuple[Path, Path, int]:
+    if zips > 99_999 - 10_001:
+        raise ValueError("--zips must fit in the 5-digit range starting at 10001")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Independent streams so changing --rows does not reshuffle geography or provider names
+    geo_rng = random.Random(f"{seed}:geo")
+    centroids = build_zip_centroids(geo_rng, max(zips, 1), states, spread_km)
+    drg_list = build_drgs(random.Random(f"{seed}:drg"), drgs)
+    provider_list = build_providers(random.Random(f"{seed}:providers"), providers, centroids)
+
+    zip_path = out_dir / f"{prefix}_zipcodes.csv"
+    prices_path = out_dir / f"{prefix}_prices_{layout}.csv"
+    write_zip_csv(zip_path, centroids)
+    written = write_prices_csv(
+        prices_path, layout, iter_price_rows(random.Random(f"{seed}:prices"), provider_list, drg_list, rows)
+    )
+    return prices_path, zip_path, written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate deterministic CMS-schema inpatient CSVs for scaling tests")
+    parser.add_argument("--out-dir", default="data/synthetic")
+    parser.add_argument("--prefix", default="synthetic", help="Output file name prefix")
+    parser.add_argument("--providers", type=int, default=500)
+    parser.add_argument("--drgs", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=20_000, help="Upper bound on price rows")
+    parser.add_argument("--zips", type=int, default=2_000, help="Number of ZIP centroids")
+    parser.add_argument("--states", type=int, default=10, help=f"Number of states to spread over (max {len(STATES)})")
+    parser.add_argument("--spread-km", type=float, default=60.0, help="Std-dev of ZIP scatter around each state anchor")
+    parser.add_argument("--layout", choices=["cms", "legacy"], default="cms")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    prices_path, zip_path, written = generate(
+        Path(args.out_dir),
+        providers=args.providers,
+        drgs=args.drgs,
+        rows=args.rows,
+        zips=args.zips,
+        states=args.states,
+        spread_km=args.spread_km,
+        layout=args.layout,
+        seed=args.seed,
+        prefix=args.prefix,
+    )
+    print(f"Wrote {written} price rows to {prices_path} and ZIP centroids to {zip_path}")
+    print(f"Load with: CMS_CSV={prices_path} ZIP_CSV={zip_path} python -m etl.etl")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import ask as ask_api
+from app.db.session import get_read_db_session
+from app.main import app
+from app.schemas.providers import DRGPrice, DRGRef, ProviderComparison
+
+
+DRGS = {
+    "hip replacement": DRGRef(term="hip replacement", drg_code=469, drg_description="MAJOR HIP AND KNEE JOINT REPLACEMENT WITH MCC"),
+    "knee": DRGRef(term="knee", drg_code=469, drg_description="MAJOR HIP AND KNEE JOINT REPLACEMENT WITH MCC"),
+    "heart failure": DRGRef(term="heart failure", drg_code=291, drg_description="HEART FAILURE AND SHOCK WITH MCC"),
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Search functions are stubbed, so no database is involved; TestClient is not entered,
+    # so the lifespan warm-up does not run either
+    async def no_session():
+        yield None
+
+    async def find_zip_centroid(session, zipc):
+        return (40.76, -73.99) if zipc == "10019" else None
+
+    async def resolve_drg_terms(session, terms):
+        return [DRGS.get(t) for t in terms]
+
+    async def compare_providers(session, *, drgs, **kwargs):
+        return [
+            ProviderComparison(
+                provider_id="330101",
+                provider_name="Midtown Hospital",
+                provider_city="New York",
+                provider_state="NY",
+                provider_zip_code="10019",
+                distance_km=1.2,
+                drgs_offered=len(drgs),
+                total_covered_charges=150000.0,
+                prices=[DRGPrice(drg_code=d.drg_code, year=2022, average_covered_charges=75000.0) for d in drgs],
+            )
+        ]
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(ask_api, "find_zip_centroid", find_zip_centroid)
+    monkeypatch.setattr(ask_api, "resolve_drg_terms", resolve_drg_terms)
+    monkeypatch.setattr(ask_api, "compare_providers", compare_providers)
+    app.dependency_overrides[get_read_db_session] = no_session
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_read_db_session, None)
+
+
+def test_ask_compare_resolves_and_compares(client):
+    resp = client.post("/ask", json={"question": "Compare hip replacement and heart failure near 10019"})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["intent"] == "compare"
+    assert body["drg_codes"] == [469, 291]
+    assert body["comparisons"][0]["drgs_offered"] == 2
+    assert "Midtown Hospital offers 2 of 2" in body["answer"]
+
+
+def test_ask_compare_reports_collapsed_terms(client):
+    resp = client.post("/ask", json={"question": "Compare knee and hip replacement near 10019"})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["comparisons"] == []
+    assert "'knee', 'hip replacement' all match DRG 469" in body["answer"]
+
+
+def test_ask_compare_reports_unknown_terms(client):
+    resp = client.post("/ask", json={"question": "Compare heart failure and unicorn repair near 10019"})
+
+    assert resp.status_code == 200
+    assert resp.json()["answer"] == "Could not find a DRG matching: unicorn repair."
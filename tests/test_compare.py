@@ -0,0 +1,44 @@
+from app.schemas.providers import DRGRef
+from app.services.nlp import fallback_parse
+from app.services.search import collapsed_drg_terms
+
+
+def test_fallback_parse_compare_terms():
+    parsed = fallback_parse("Compare hip replacement and heart failure near 10019")
+
+    assert parsed["intent"] == "compare"
+    assert parsed["drg_terms"] == ["hip replacement", "heart failure"]
+    assert parsed["zip"] == "10019"
+
+
+def test_fallback_parse_compare_codes():
+    parsed = fallback_parse("Compare DRG 470 vs DRG 469 within 20 miles of 10001")
+
+    assert parsed["intent"] == "compare"
+    assert parsed["drg_terms"] == ["470", "469"]
+    assert parsed["drg_code"] == 470
+    assert round(parsed["radius_km"], 1) == 32.2
+
+
+def test_fallback_parse_single_drg_is_not_compare():
+    parsed = fallback_parse("Who is cheapest for DRG 470 near 10001 in 2021?")
+
+    assert parsed["intent"] == "cheapest"
+    assert parsed["drg_terms"] == []
+    assert parsed["year"] == 2021
+
+
+def _ref(term: str, code: int) -> DRGRef:
+    return DRGRef(term=term, drg_code=code, drg_description=f"DRG {code}")
+
+
+def test_collapsed_drg_terms():
+    terms = ["knee", "hip replacement", "heart failure"]
+    refs = [_ref("knee", 469), _ref("hip replacement", 469), _ref("heart failure", 291)]
+
+    message = collapsed_drg_terms(terms, refs)
+
+    assert message is not None
+    assert "'knee', 'hip replacement' all match DRG 469" in message
+    assert "291" not in message
+    assert collapsed_drg_terms(terms[1:], refs[1:]) is None
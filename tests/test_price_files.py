@@ -0,0 +1,55 @@
+import asyncio
+
+from etl import etl
+from etl.etl import DEFAULT_DATA_YEAR, PriceFile, infer_year, parse_price_files
+from etl.profiling import EtlProfiler
+
+
+def test_infer_year_from_file_name():
+    assert infer_year("data/inpatient_ny_2021.csv") == 2021
+    assert infer_year("data/2019/MUP_INP_RY23_P03_V10_DY21_PrvSvc.csv") == DEFAULT_DATA_YEAR
+    assert infer_year("data/sample_prices_ny.csv") == DEFAULT_DATA_YEAR
+
+
+def test_explicit_years_and_lists():
+    files = parse_price_files("2021=data/a.csv, data/b_2023.csv,,data/c.csv")
+
+    assert files == [
+        PriceFile(path="data/a.csv", year=2021),
+        PriceFile(path="data/b_2023.csv", year=2023),
+        PriceFile(path="data/c.csv", year=DEFAULT_DATA_YEAR),
+    ]
+
+
+def test_globs_expand_sorted_and_deduplicated(tmp_path):
+    for name in ("ny_2021.csv", "ca_2021.csv", "tx.csv"):
+        (tmp_path / name).touch()
+
+    files = parse_price_files(f"{tmp_path}/*_2021.csv,{tmp_path}/ca_2021.csv,2020={tmp_path}/tx*.csv")
+
+    assert files == [
+        PriceFile(path=str(tmp_path / "ca_2021.csv"), year=2021),
+        PriceFile(path=str(tmp_path / "ny_2021.csv"), year=2021),
+        PriceFile(path=str(tmp_path / "tx.csv"), year=2020),
+    ]
+
+
+def test_unmatched_glob_is_kept_for_the_missing_file_report(tmp_path):
+    pattern = f"{tmp_path}/missing_*.csv"
+
+    assert parse_price_files(pattern) == [PriceFile(path=pattern, year=DEFAULT_DATA_YEAR)]
+
+
+def test_failed_file_does_not_drop_committed_loads(monkeypatch):
+    async def fake_load(price_file, provider_keys, profiler, limit):
+        if price_file.year == 2020:
+            raise RuntimeError("bad row")
+        return etl.FileLoad(price_file, loaded=1)
+
+    monkeypatch.setattr(etl, "load_price_file", fake_load)
+    files = [PriceFile("a.csv", 2020), PriceFile("b.csv", 2021), PriceFile("c.csv", 2022)]
+
+    loads, failures = asyncio.run(etl.load_prices(files, {}, EtlProfiler()))
+
+    assert [load.price_file.year for load in loads] == [2021, 2022]
+    assert [(f.path, str(exc)) for f, exc in failures] == [("a.csv", "bad row")]
@@ -0,0 +1,124 @@
+import math
+import os
+from array import array
+
+import pytest
+
+from app.services import snapshot
+from etl.snapshot import _previous_generation, write_snapshot_file
+
+
+def _sections(zips: list[tuple[int, float, float]]) -> dict[str, array]:
+    sections = {name: array(typecode) for name, typecode in snapshot.SECTIONS}
+    for code, lat, lon in zips:
+        sections["zip_code"].append(code)
+        sections["zip_lat"].append(lat)
+        sections["zip_lon"].append(lon)
+    return sections
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot_file(path, _sections([(501, 40.8, -73.0), (10001, 40.75, -73.99), (10002, math.nan, math.nan)]), 3)
+
+    snap = snapshot.Snapshot(path)
+
+    assert snap.generation == 3
+    assert snap.zip_count == 3
+    assert snap.zip_centroid("10001") == (40.75, -73.99)
+    assert snap.zip_centroid("00501") == (40.8, -73.0)
+    # Missing coordinates and unknown or malformed ZIPs fall through to the DB
+    assert snap.zip_centroid("10002") is None
+    assert snap.zip_centroid("10003") is None
+    assert snap.zip_centroid("1000A") is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_rejects_other_versions(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(snapshot.HEADER.pack(snapshot.MAGIC, snapshot.VERSION + 1, 1, 0.0).ljust(snapshot.header_size(), b"\0"))
+
+    with pytest.raises(ValueError):
+        snapshot.Snapshot(str(path))
+    assert _previous_generation(str(path)) == 0
+
+
+def test_get_snapshot_picks_up_new_generation(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.bin")
+    monkeypatch.setattr(snapshot, "SNAPSHOT_PATH", path)
+    monkeypatch.setattr(snapshot, "_current", None)
+    monkeypatch.setattr(snapshot, "_last_check", None)
+    monkeypatch.setattr(snapshot, "_rejected", None)
+
+    assert snapshot.get_snapshot() is None
+
+    write_snapshot_file(path, _sections([(10001, 40.75, -73.99)]), _previous_generation(path) + 1)
+    monkeypatch.setattr(snapshot, "_last_check", None)
+    first = snapshot.get_snapshot()
+    assert first.generation == 1
+
+    write_snapshot_file(path, _sections([(10001, 41.0, -74.0)]), _previous_generation(path) + 1)
+    monkeypatch.setattr(snapshot, "_last_check", None)
+    second = snapshot.get_snapshot()
+    assert second.generation == 2
+    assert second.zip_centroid("10001") == (41.0, -74.0)
+    # The replaced mapping stays readable for requests still holding it
+    assert first.zip_centroid("10001") == (40.75, -73.99)
+
+
+def test_stale_file_is_checked_once_per_interval(tmp_path, monkeypatch):
+    path = tmp_path / "snapshot.bin"
+    # A file from an older format, as left behind by an upgrade
+    path.write_bytes(snapshot.HEADER.pack(snapshot.MAGIC, snapshot.VERSION - 1, 1, 0.0).ljust(snapshot.header_size(), b"\0"))
+    monkeypatch.setattr(snapshot, "SNAPSHOT_PATH", str(path))
+    monkeypatch.setattr(snapshot, "SNAPSHOT_CHECK_INTERVAL", 5.0)
+    monkeypatch.setattr(snapshot, "_current", None)
+    monkeypatch.setattr(snapshot, "_last_check", None)
+    monkeypatch.setattr(snapshot, "_rejected", None)
+
+    builds = []
+    real_snapshot = snapshot.Snapshot
+
+    def counting_snapshot(p):
+        builds.append(p)
+        return real_snapshot(p)
+
+    stats = []
+    real_stat = snapshot.os.stat
+
+    def counting_stat(p, *args, **kwargs):
+        stats.append(p)
+        return real_stat(p, *args, **kwargs)
+
+    clock = [1000.0]
+    monkeypatch.setattr(snapshot, "Snapshot", counting_snapshot)
+    monkeypatch.setattr(snapshot.os, "stat", counting_stat)
+    monkeypatch.setattr(snapshot.time, "monotonic", lambda: clock[0])
+
+    assert all(snapshot.get_snapshot() is None for _ in range(1000))
+    assert len(builds) == 1
+    assert len(stats) == 1
+
+    # After the interval the file is stat-ed again but, unchanged, not re-parsed
+    clock[0] += 6.0
+    assert snapshot.get_snapshot() is None
+    assert len(stats) == 2
+    assert len(builds) == 1
+
+    # Once the ETL publishes a valid file it is picked up on the next check
+    write_snapshot_file(str(path), _sections([(10001, 40.75, -73.99)]), 1)
+    clock[0] += 6.0
+    assert snapshot.get_snapshot().zip_centroid("10001") == (40.75, -73.99)
+    assert len(builds) == 2
+
+
+def test_missing_file_is_checked_once_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_PATH", str(tmp_path / "absent.bin"))
+    monkeypatch.setattr(snapshot, "_current", None)
+    monkeypatch.setattr(snapshot, "_last_check", None)
+    stats = []
+    real_stat = snapshot.os.stat
+    monkeypatch.setattr(snapshot.os, "stat", lambda p, *a, **k: stats.append(p) or real_stat(p, *a, **k))
+
+    assert all(snapshot.get_snapshot() is None for _ in range(100))
+    assert len(stats) == 1
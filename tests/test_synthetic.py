@@ -0,0 +1,51 @@
+import csv
+
+from etl.synthetic import generate
+
+
+PARAMS = dict(providers=40, drgs=25, rows=600, zips=120, states=4, spread_km=60.0, seed=7)
+
+
+def _generate(out_dir, layout="cms", **overrides):
+    return generate(out_dir, layout=layout, **{**PARAMS, **overrides})
+
+
+def test_same_arguments_produce_identical_files(tmp_path):
+    first = _generate(tmp_path / "a")
+    second = _generate(tmp_path / "b")
+
+    assert first[0].read_bytes() == second[0].read_bytes()
+    assert first[1].read_bytes() == second[1].read_bytes()
+    assert first[2] == second[2]
+
+
+def test_seed_changes_prices(tmp_path):
+    prices_a, _, _ = _generate(tmp_path / "a")
+    prices_b, _, _ = _generate(tmp_path / "b", seed=8)
+
+    assert prices_a.read_bytes() != prices_b.read_bytes()
+
+
+def test_row_count_and_zip_numbering(tmp_path):
+    prices, zips, written = _generate(tmp_path)
+
+    with open(prices, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    with open(zips, newline="", encoding="utf-8") as f:
+        zip_rows = list(csv.DictReader(f))
+
+    assert len(rows) == written
+    assert abs(written - PARAMS["rows"]) <= PARAMS["rows"] * 0.1
+    # (provider, DRG) pairs are unique, as in CMS files
+    assert len({(r["Rndrng_Prvdr_CCN"], r["DRG_Cd"]) for r in rows}) == written
+    assert zip_rows[0]["zip"] == "10001"
+    assert zip_rows[0]["state"] == "NY"
+
+
+def test_legacy_layout_columns(tmp_path):
+    prices, _, _ = _generate(tmp_path, layout="legacy")
+
+    with open(prices, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+
+    assert header[:2] == ["ms_drg_definition", "provider_id"]